@@ -3,24 +3,23 @@ from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from apps.core.models import UserProfile
 
+class UserProfileSerializer(serializers.ModelSerializer):
+    """Nested profile data for UserSerializer"""
+    stores = serializers.SlugRelatedField(many=True, read_only=True, slug_field='store_id')
+
+    class Meta:
+        model = UserProfile
+        fields = ['role', 'stores', 'phone']
+
 class UserSerializer(serializers.ModelSerializer):
     """User serializer with profile data"""
-    profile = serializers.SerializerMethodField()
-    
+    # Nested serializer avoids per-object method-field dispatch and reads the
+    # userprofile/stores prefetch caches set up by the views
+    profile = UserProfileSerializer(source='userprofile', read_only=True, default=None)
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'profile']
-    
-    def get_profile(self, obj):
-        try:
-            profile = obj.userprofile
-            return {
-                'role': profile.role,
-                'stores': [store.store_id for store in profile.stores.all()],
-                'phone': profile.phone,
-            }
-        except UserProfile.DoesNotExist:
-            return None
 
 class LoginSerializer(serializers.Serializer):
     """Login serializer"""
@@ -4,12 +4,20 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
+from django.contrib.auth.models import User
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from .serializers import LoginSerializer, UserSerializer, ChangePasswordSerializer
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _user_with_profile(user):
+    """Re-fetch a user with profile data prefetched for serialization"""
+    return User.objects.select_related('userprofile').prefetch_related(
+        'userprofile__stores'
+    ).get(pk=user.pk)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
@@ -28,7 +36,7 @@ def login_view(request):
         
         return Response({
             'token': token.key,
-            'user': UserSerializer(user).data,
+            'user': UserSerializer(_user_with_profile(user)).data,
             'message': 'Login successful'
         }, status=status.HTTP_200_OK)
     
@@ -62,7 +70,7 @@ def logout_view(request):
 @permission_classes([IsAuthenticated])
 def profile_view(request):
     """Get current user profile"""
-    return Response(UserSerializer(request.user).data)
+    return Response(UserSerializer(_user_with_profile(request.user)).data)
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
@@ -76,10 +84,13 @@ def change_password_view(request):
     if serializer.is_valid():
         user = request.user
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
-        
-        # Delete existing tokens to force re-login
-        Token.objects.filter(user=user).delete()
+
+        # Persist the new password and revoke tokens atomically so a crash
+        # can't leave old tokens valid for the new password
+        with transaction.atomic():
+            user.save(update_fields=['password'])
+            # Delete existing tokens to force re-login
+            Token.objects.filter(user_id=user.id).delete()
         
         logger.info(f"Password changed for user {user.username}", 
                    extra={'user_id': user.id})
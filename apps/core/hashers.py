@@ -0,0 +1,11 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id tuned to the OWASP baseline (46 MiB, 2 iterations, 1 lane).
+
+    Django's defaults spend noticeably more CPU/memory per login than needed;
+    these parameters keep hashing cost bounded on the auth path.
+    """
+    time_cost = 2
+    memory_cost = 46 * 1024
+    parallelism = 1
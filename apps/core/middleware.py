@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import JsonResponse
+
+class MaxUploadSizeMiddleware:
+    """Reject oversized uploads from the Content-Length header alone.
+
+    Checking the declared size before the body is read keeps the worker from
+    buffering tens of megabytes just to reject the request in a serializer.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+
+    def __call__(self, request):
+        content_length = request.META.get('CONTENT_LENGTH')
+        if content_length:
+            try:
+                if int(content_length) > self.max_size:
+                    return JsonResponse({
+                        'error': f'Request body cannot exceed {self.max_size // (1024 * 1024)}MB.'
+                    }, status=413)
+            except ValueError:
+                pass
+        return self.get_response(request)
@@ -3,23 +3,41 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 import uuid
 
-class BaseModel(models.Model):
-    """Base model with common fields"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class TimeStampedModel(models.Model):
+    """Common audit fields shared by all base models"""
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
-        User, 
-        on_delete=models.SET_NULL, 
-        null=True, 
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
         blank=True,
         related_name='%(class)s_created'
     )
-    
+
+    class Meta:
+        abstract = True
+
+class UUIDBaseModel(TimeStampedModel):
+    """Base model with a UUID primary key for externally-exposed entities"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    class Meta:
+        abstract = True
+
+class BaseModel(TimeStampedModel):
+    """Base model for high-volume tables.
+
+    Uses the default sequential BigAutoField primary key so inserts append to
+    the B-tree instead of landing on random leaf pages, and keeps a unique
+    UUID column for external references.
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+
     class Meta:
         abstract = True
 
-class Store(BaseModel):
+class Store(UUIDBaseModel):
     """Store model"""
     store_id = models.CharField(max_length=50, unique=True)
     name = models.CharField(max_length=200)
@@ -32,7 +50,7 @@ class Store(BaseModel):
     def __str__(self):
         return f"{self.store_id} - {self.name}"
 
-class Product(BaseModel):
+class Product(UUIDBaseModel):
     """Product/SKU model"""
     sku_id = models.CharField(max_length=50, unique=True)
     name = models.CharField(max_length=200)
@@ -46,7 +64,7 @@ class Product(BaseModel):
     def __str__(self):
         return f"{self.sku_id} - {self.name}"
 
-class UserProfile(BaseModel):
+class UserProfile(UUIDBaseModel):
     """Extended user profile"""
     ROLE_CHOICES = [
         ('admin', 'Administrator'),
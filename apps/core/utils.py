@@ -0,0 +1,18 @@
+def get_accessible_store_ids(user):
+    """Return the store PKs a user may access, or None for unrestricted access.
+
+    The result is memoized on the user object so repeated calls within a
+    request don't re-issue the M2M lookup.
+    """
+    cached = getattr(user, '_accessible_store_ids', False)
+    if cached is not False:
+        return cached
+
+    profile = getattr(user, 'userprofile', None)
+    if not profile or profile.role == 'admin':
+        store_ids = None  # means "all stores"
+    else:
+        store_ids = list(profile.stores.values_list('pk', flat=True))
+
+    user._accessible_store_ids = store_ids
+    return store_ids
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.data_management.models import SalesData
+from apps.forecasting.models import InventoryAlert
+from .views import bump_stats_cache_version
+
+@receiver(post_save, sender=SalesData)
+@receiver(post_delete, sender=SalesData)
+@receiver(post_save, sender=InventoryAlert)
+@receiver(post_delete, sender=InventoryAlert)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """Invalidate cached dashboard stats when underlying data changes"""
+    bump_stats_cache_version()
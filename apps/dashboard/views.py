@@ -1,14 +1,39 @@
+import hashlib
+
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count, Sum, Avg, Q
+from django.db.models import Count, F, Sum, Avg, Q
+from django.db.models.functions import Abs
 from django.utils import timezone
 from datetime import timedelta
 from apps.data_management.models import SalesData, DataUpload
-from apps.forecasting.models import ForecastPrediction, InventoryAlert, MLModel
+from apps.forecasting.models import ForecastPrediction, InventoryAlert, MLModel, StockoutSummary
 from apps.core.models import Store, Product
+from apps.core.utils import get_accessible_store_ids
+
+# Dashboard stats are polled by the frontend; a short TTL plus a version
+# counter (bumped when sales data or alerts change) keeps them fresh enough
+# while serving the common case from cache instead of ~10 SQL round-trips
+STATS_CACHE_TTL = 45
+STATS_CACHE_VERSION_KEY = 'dashboard:stats:version'
+
+def bump_stats_cache_version():
+    """Invalidate all cached dashboard stats by moving to a new key space"""
+    try:
+        cache.incr(STATS_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(STATS_CACHE_VERSION_KEY, 1, timeout=None)
+
+def _stats_cache_key(user, store_ids, today):
+    store_hash = hashlib.md5(
+        ','.join(sorted(str(pk) for pk in store_ids or [])).encode()
+    ).hexdigest()
+    version = cache.get(STATS_CACHE_VERSION_KEY, 0)
+    return f"dashboard:stats:{version}:{user.id}:{store_hash}:{today.isoformat()}"
 
 def home(request):
     """Render the main dashboard page"""
@@ -24,30 +49,34 @@ def dashboard_view(request):
 def dashboard_stats(request):
     """Get dashboard statistics and KPIs"""
     user = request.user
-    user_profile = getattr(user, 'userprofile', None)
-    
-    # Get accessible stores for non-admin users
-    accessible_stores = None
-    if user_profile and user_profile.role != 'admin':
-        accessible_stores = user_profile.stores.all()
-    
-    # Base querysets
-    sales_qs = SalesData.objects.all()
-    alerts_qs = InventoryAlert.objects.all()
-    predictions_qs = ForecastPrediction.objects.all()
-    
-    if accessible_stores:
-        sales_qs = sales_qs.filter(store__in=accessible_stores)
-        alerts_qs = alerts_qs.filter(store__in=accessible_stores)
-        predictions_qs = predictions_qs.filter(store__in=accessible_stores)
-    
+
+    # Resolve accessible stores once; reusing the PK list avoids re-issuing
+    # the M2M subquery in every filter below
+    store_ids = get_accessible_store_ids(user)
+
     # Date ranges
     today = timezone.now().date()
     last_30_days = today - timedelta(days=30)
     last_7_days = today - timedelta(days=7)
-    
+
+    # Serve from cache when a recent copy exists for this user/store scope
+    cache_key = _stats_cache_key(user, store_ids, today)
+    cached_stats = cache.get(cache_key)
+    if cached_stats is not None:
+        return Response(cached_stats)
+
+    # Base querysets
+    sales_qs = SalesData.objects.all()
+    alerts_qs = InventoryAlert.objects.all()
+    predictions_qs = ForecastPrediction.objects.all()
+
+    if store_ids:
+        sales_qs = sales_qs.filter(store_id__in=store_ids)
+        alerts_qs = alerts_qs.filter(store_id__in=store_ids)
+        predictions_qs = predictions_qs.filter(store_id__in=store_ids)
+
     # Core statistics
-    total_stores = accessible_stores.count() if accessible_stores else Store.objects.count()
+    total_stores = len(store_ids) if store_ids else Store.objects.count()
     total_products = Product.objects.filter(is_active=True).count()
     total_uploads = DataUpload.objects.filter(created_by=user).count()
     
@@ -64,14 +93,16 @@ def dashboard_stats(request):
     )
     alerts_summary = {alert['priority']: alert['count'] for alert in alerts_by_priority}
     
-    # Stockout predictions (next 30 days)
+    # Stockout predictions (next 30 days) - served from the precomputed
+    # summary table refreshed by Celery instead of an on-request DISTINCT
     future_predictions = predictions_qs.filter(
         prediction_date__range=[today, today + timedelta(days=30)]
     )
-    
-    stockout_predictions = future_predictions.filter(
-        predicted_demand__gt=0  # Simple stockout logic - can be enhanced
-    ).values('store__store_id', 'product__sku_id').distinct().count()
+
+    stockout_qs = StockoutSummary.objects.filter(date=today)
+    if store_ids:
+        stockout_qs = stockout_qs.filter(store_id__in=store_ids)
+    stockout_predictions = stockout_qs.count()
     
     # Model performance
     active_model = MLModel.objects.filter(is_active=True).first()
@@ -92,7 +123,7 @@ def dashboard_stats(request):
     
     upload_stats = {upload['status']: upload['count'] for upload in recent_uploads}
     
-    return Response({
+    stats = {
         'overview': {
             'total_stores': total_stores,
             'total_products': total_products,
@@ -116,28 +147,28 @@ def dashboard_stats(request):
             'last_30_days': last_30_days,
             'last_7_days': last_7_days,
         }
-    })
+    }
+
+    cache.set(cache_key, stats, STATS_CACHE_TTL)
+    return Response(stats)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def sales_trends(request):
     """Get sales trends data for charts"""
-    user = request.user
-    user_profile = getattr(user, 'userprofile', None)
-    
-    # Get date range from query params
-    days = int(request.GET.get('days', 30))
+    # Get date range from query params, capped so a single request can't ask
+    # the DB to aggregate an unbounded window
+    days = min(int(request.GET.get('days', 30)), 365)
     end_date = timezone.now().date()
     start_date = end_date - timedelta(days=days)
-    
+
     # Base queryset
     sales_qs = SalesData.objects.filter(date__range=[start_date, end_date])
-    
+
     # Filter by accessible stores if not admin
-    if user_profile and user_profile.role != 'admin':
-        accessible_stores = user_profile.stores.all()
-        if accessible_stores.exists():
-            sales_qs = sales_qs.filter(store__in=accessible_stores)
+    store_ids = get_accessible_store_ids(request.user)
+    if store_ids:
+        sales_qs = sales_qs.filter(store_id__in=store_ids)
     
     # Daily sales trend
     daily_sales = sales_qs.values('date').annotate(
@@ -151,7 +182,7 @@ def sales_trends(request):
         'product__sku_id', 'product__name'
     ).annotate(
         total_sales=Sum('sales'),
-        total_revenue=Sum('sales') * Avg('price')
+        total_revenue=Sum(F('sales') * F('price'))
     ).order_by('-total_sales')[:10]
     
     # Store performance
@@ -177,17 +208,16 @@ def sales_trends(request):
 @permission_classes([IsAuthenticated])
 def forecast_accuracy(request):
     """Get forecast accuracy metrics"""
-    user = request.user
-    user_profile = getattr(user, 'userprofile', None)
-    
-    # Get predictions with actual values
-    predictions_qs = ForecastPrediction.objects.exclude(actual_demand__isnull=True)
-    
+    # Get predictions with actual values, projecting only the columns the
+    # accuracy math needs so nothing pulls full rows off the wire
+    predictions_qs = ForecastPrediction.objects.exclude(
+        actual_demand__isnull=True
+    ).only('prediction_date', 'predicted_demand', 'actual_demand', 'store_id')
+
     # Filter by accessible stores if not admin
-    if user_profile and user_profile.role != 'admin':
-        accessible_stores = user_profile.stores.all()
-        if accessible_stores.exists():
-            predictions_qs = predictions_qs.filter(store__in=accessible_stores)
+    store_ids = get_accessible_store_ids(request.user)
+    if store_ids:
+        predictions_qs = predictions_qs.filter(store_id__in=store_ids)
     
     # Calculate accuracy metrics by date
     accuracy_by_date = predictions_qs.values('prediction_date').annotate(
@@ -196,16 +226,19 @@ def forecast_accuracy(request):
         avg_actual=Avg('actual_demand')
     ).order_by('prediction_date')
     
-    # Calculate overall accuracy
-    total_predictions = predictions_qs.count()
+    # Calculate overall accuracy in a single DB-side aggregate instead of
+    # transferring every prediction row and summing errors in Python
+    overall = predictions_qs.aggregate(
+        total_predictions=Count('id'),
+        total_error=Sum(Abs(F('predicted_demand') - F('actual_demand'))),
+        total_actual=Sum('actual_demand')
+    )
+
+    total_predictions = overall['total_predictions']
     if total_predictions > 0:
-        # Simple accuracy calculation (can be enhanced with more sophisticated metrics)
-        accuracy_data = list(predictions_qs.values('predicted_demand', 'actual_demand'))
-        
-        total_error = sum(abs(p['predicted_demand'] - p['actual_demand']) for p in accuracy_data)
+        total_error = overall['total_error'] or 0
+        total_actual = overall['total_actual'] or 0
         mean_absolute_error = total_error / total_predictions
-        
-        total_actual = sum(p['actual_demand'] for p in accuracy_data)
         mean_absolute_percentage_error = (total_error / total_actual) * 100 if total_actual > 0 else 0
     else:
         mean_absolute_error = 0
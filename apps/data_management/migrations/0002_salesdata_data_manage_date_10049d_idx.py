@@ -0,0 +1,20 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('data_management', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salesdata',
+            index=models.Index(fields=['date', 'product'], name='data_manage_date_10049d_idx'),
+        ),
+    ]
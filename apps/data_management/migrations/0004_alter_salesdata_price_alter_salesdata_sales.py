@@ -0,0 +1,23 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0003_salesdata_data_manage_date_e41170_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='salesdata',
+            name='price',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='sales',
+            field=models.FloatField(),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0004_alter_salesdata_price_alter_salesdata_sales'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datavalidationerror',
+            index=models.Index(fields=['upload', 'row_number'], name='data_manage_upload__6b8238_idx'),
+        ),
+    ]
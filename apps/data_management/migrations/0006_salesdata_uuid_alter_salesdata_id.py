@@ -0,0 +1,65 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:31
+
+import uuid
+from django.db import migrations, models
+
+
+def backfill_salesdata_uuids(apps, schema_editor):
+    """Copy the old UUID primary key into the new uuid column.
+
+    Adding the column with unique=True in one step would evaluate the
+    default once and write the same uuid to every row, so the field is
+    added nullable first and filled here. Reusing the old pk value keeps
+    any externally recorded row identifiers valid.
+    """
+    table = schema_editor.connection.ops.quote_name('data_management_salesdata')
+    schema_editor.execute(f'UPDATE {table} SET uuid = id WHERE uuid IS NULL')
+
+
+def renumber_salesdata_ids(apps, schema_editor):
+    """Give every row a sequential integer id ahead of the type change.
+
+    The column still holds UUID strings at this point; the BigAutoField
+    conversion below can only cast rows that already contain integers.
+    """
+    table = schema_editor.connection.ops.quote_name('data_management_salesdata')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT id FROM {table} ORDER BY created_at, id')
+        old_ids = [row[0] for row in cursor.fetchall()]
+        for new_id, old_id in enumerate(old_ids, start=1):
+            cursor.execute(
+                f'UPDATE {table} SET id = %s WHERE id = %s', [new_id, old_id]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0005_datavalidationerror_data_manage_upload__6b8238_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesdata',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            backfill_salesdata_uuids,
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.RunPython(
+            renumber_salesdata_ids,
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name='salesdata',
+            name='id',
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+        ),
+    ]
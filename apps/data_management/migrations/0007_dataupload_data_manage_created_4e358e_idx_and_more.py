@@ -0,0 +1,23 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0006_salesdata_uuid_alter_salesdata_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataupload',
+            index=models.Index(fields=['created_by', 'created_at'], name='data_manage_created_4e358e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataupload',
+            index=models.Index(fields=['created_by', 'status'], name='data_manage_created_828274_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.17 on 2026-08-28 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('data_management', '0007_dataupload_data_manage_created_4e358e_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='salesdata',
+            constraint=models.CheckConstraint(check=models.Q(('sales__gte', 0)), name='salesdata_sales_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesdata',
+            constraint=models.CheckConstraint(check=models.Q(('price__gte', 0)), name='salesdata_price_non_negative'),
+        ),
+    ]
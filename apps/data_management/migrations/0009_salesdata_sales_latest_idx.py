@@ -0,0 +1,20 @@
+# Generated by Django 5.2.17 on 2026-08-28 13:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('data_management', '0008_salesdata_salesdata_sales_non_negative_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salesdata',
+            index=models.Index(fields=['store', 'product', '-date'], name='sales_latest_idx'),
+        ),
+    ]
@@ -1,14 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import User
-from apps.core.models import BaseModel, Store, Product
+from apps.core.models import BaseModel, UUIDBaseModel, Store, Product
 
 class SalesData(BaseModel):
     """Sales data model"""
     store = models.ForeignKey(Store, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     date = models.DateField()
-    sales = models.DecimalField(max_digits=10, decimal_places=2)
-    price = models.DecimalField(max_digits=8, decimal_places=2)
+    # Floats keep aggregation on the DB's hardware FP path and avoid Decimal
+    # instantiation per row when the dashboard sums/averages these columns
+    sales = models.FloatField()
+    price = models.FloatField()
     on_hand = models.IntegerField()
     promotions_flag = models.BooleanField(default=False)
     
@@ -19,12 +21,24 @@ class SalesData(BaseModel):
             models.Index(fields=['date']),
             models.Index(fields=['store', 'product']),
             models.Index(fields=['date', 'store']),
+            models.Index(fields=['date', 'product']),
+            models.Index(fields=['date', 'store', 'product']),
+            # Seek path for the latest-sale-per-pair lookups in alerting
+            models.Index(fields=['store', 'product', '-date'], name='sales_latest_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(sales__gte=0), name='salesdata_sales_non_negative'
+            ),
+            models.CheckConstraint(
+                check=models.Q(price__gte=0), name='salesdata_price_non_negative'
+            ),
         ]
     
     def __str__(self):
         return f"{self.store.store_id} - {self.product.sku_id} - {self.date}"
 
-class DataUpload(BaseModel):
+class DataUpload(UUIDBaseModel):
     """Track data upload jobs"""
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -41,14 +55,18 @@ class DataUpload(BaseModel):
     error_records = models.IntegerField(default=0)
     error_log = models.TextField(blank=True)
     celery_task_id = models.CharField(max_length=255, blank=True)
-    
+
     class Meta:
         ordering = ['-created_at']
-    
+        indexes = [
+            models.Index(fields=['created_by', 'created_at']),
+            models.Index(fields=['created_by', 'status']),
+        ]
+
     def __str__(self):
         return f"{self.original_filename} - {self.status}"
 
-class DataValidationError(BaseModel):
+class DataValidationError(UUIDBaseModel):
     """Track data validation errors"""
     upload = models.ForeignKey(DataUpload, on_delete=models.CASCADE, related_name='validation_errors')
     row_number = models.IntegerField()
@@ -59,11 +77,14 @@ class DataValidationError(BaseModel):
     
     class Meta:
         ordering = ['upload', 'row_number']
-    
+        indexes = [
+            models.Index(fields=['upload', 'row_number']),
+        ]
+
     def __str__(self):
         return f"{self.upload.original_filename} - Row {self.row_number}: {self.error_type}"
 
-class DataQualityReport(BaseModel):
+class DataQualityReport(UUIDBaseModel):
     """Data quality assessment reports"""
     date_range_start = models.DateField()
     date_range_end = models.DateField()
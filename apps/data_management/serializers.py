@@ -27,6 +27,11 @@ class DataUploadSerializer(serializers.ModelSerializer):
         ]
     
     def get_progress_percentage(self, obj):
+        # Prefer the DB-annotated value from list views; fall back to the
+        # Python computation when serializing a bare instance
+        annotated = getattr(obj, 'progress_percentage', None)
+        if annotated is not None:
+            return round(annotated, 2)
         if obj.total_records and obj.total_records > 0:
             return round((obj.processed_records / obj.total_records) * 100, 2)
         return 0
@@ -56,18 +61,13 @@ class DataUploadCreateSerializer(serializers.ModelSerializer):
         fields = ['file']
     
     def validate_file(self, value):
-        # Check file extension
+        # Check file extension; oversized uploads are rejected before the
+        # body is read by MaxUploadSizeMiddleware
         if not value.name.lower().endswith(('.csv', '.xlsx')):
             raise serializers.ValidationError(
                 "Only CSV and Excel files are allowed."
             )
-        
-        # Check file size (50MB limit)
-        if value.size > 50 * 1024 * 1024:
-            raise serializers.ValidationError(
-                "File size cannot exceed 50MB."
-            )
-        
+
         return value
     
     def create(self, validated_data):
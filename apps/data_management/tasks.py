@@ -1,5 +1,6 @@
-from celery import shared_task
-from django.db import transaction
+from celery import chord, shared_task
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from .models import DataUpload, SalesData, DataValidationError, DataQualityReport
 from apps.core.models import Store, Product
@@ -7,70 +8,160 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+def _count_upload_records(file_path):
+    """Count data rows without parsing the whole file into memory"""
+    if file_path.endswith('.csv'):
+        with open(file_path, 'rb') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return max((workbook.active.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+# Explicit dtypes skip per-column inference and keep ID columns out of
+# object arrays. Numeric columns stay unspecified on purpose: they are
+# coerced per-row in _process_chunk so one bad value fails that row rather
+# than the whole read.
+CSV_DTYPES = {'store_id': 'string', 'sku_id': 'string'}
+
+def _iter_upload_chunks(file_path, chunk_size):
+    """Yield DataFrame chunks from a CSV/Excel upload, one chunk in RAM at a time"""
+    if file_path.endswith('.csv'):
+        yield from pd.read_csv(file_path, chunksize=chunk_size, dtype=CSV_DTYPES)
+        return
+
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(col) for col in next(rows)]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
 @shared_task(bind=True)
 def process_data_upload(self, upload_id):
     """Process uploaded CSV/Excel file"""
     try:
         upload = DataUpload.objects.get(id=upload_id)
         upload.status = 'processing'
-        upload.save()
-        
+        upload.save(update_fields=['status', 'updated_at'])
+
         logger.info(f"Starting processing for upload {upload_id}")
-        
-        # Read the file
+
+        # Stream the file chunk by chunk instead of loading it whole
         file_path = upload.file.path
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-        
-        upload.total_records = len(df)
-        upload.save()
-        
-        # Validate required columns
+        chunk_size = 10000
+
+        upload.total_records = _count_upload_records(file_path)
+        upload.save(update_fields=['total_records', 'updated_at'])
+
         required_columns = ['date', 'store_id', 'sku_id', 'sales', 'price', 'on_hand', 'promotions_flag']
-        missing_columns = set(required_columns) - set(df.columns)
-        
-        if missing_columns:
-            error_msg = f"Missing required columns: {', '.join(missing_columns)}"
-            upload.status = 'failed'
-            upload.error_log = error_msg
-            upload.save()
-            return {'status': 'failed', 'error': error_msg}
-        
-        # Process data in chunks
-        chunk_size = 1000
+
+        if file_path.endswith('.csv'):
+            # CSV chunks are independent row ranges, so they fan out to the
+            # worker pool as a chord; each subtask re-reads only its slice
+            # and a callback finalizes the upload once every chunk lands
+            missing_columns = set(required_columns) - set(pd.read_csv(file_path, nrows=0).columns)
+            if missing_columns:
+                error_msg = f"Missing required columns: {', '.join(missing_columns)}"
+                upload.status = 'failed'
+                upload.error_log = error_msg
+                upload.save(update_fields=['status', 'error_log', 'updated_at'])
+                return {'status': 'failed', 'error': error_msg}
+
+            chunk_starts = list(range(0, upload.total_records, chunk_size))
+            if not chunk_starts:
+                upload.status = 'completed'
+                upload.save(update_fields=['status', 'updated_at'])
+                return {'status': 'completed', 'processed': 0, 'errors': 0, 'total': 0}
+
+            chord(
+                process_upload_chunk.s(upload_id, start, chunk_size)
+                for start in chunk_starts
+            )(finalize_upload.s(upload_id).on_error(fail_upload.s(upload_id)))
+
+            return {
+                'status': 'dispatched',
+                'chunks': len(chunk_starts),
+                'total': upload.total_records
+            }
+
+        # Excel workbooks only stream front-to-back, so they keep the serial
+        # per-chunk loop: slicing them across workers would re-scan the sheet
+        # once per subtask
+
+        # Preload the natural-key maps once; chunks extend them on misses
+        store_map = dict(Store.objects.values_list('store_id', 'pk'))
+        product_map = dict(Product.objects.values_list('sku_id', 'pk'))
+
         processed_count = 0
         error_count = 0
-        
-        for chunk_start in range(0, len(df), chunk_size):
-            chunk_end = min(chunk_start + chunk_size, len(df))
-            chunk_df = df.iloc[chunk_start:chunk_end]
-            
-            processed, errors = _process_chunk(chunk_df, upload, chunk_start)
+        chunk_start = 0
+        chunk_index = 0
+        columns_validated = False
+        last_progress_emit = time.monotonic()
+
+        for chunk_df in _iter_upload_chunks(file_path, chunk_size):
+            # Validate required columns on the first chunk
+            if not columns_validated:
+                missing_columns = set(required_columns) - set(chunk_df.columns)
+                if missing_columns:
+                    error_msg = f"Missing required columns: {', '.join(missing_columns)}"
+                    upload.status = 'failed'
+                    upload.error_log = error_msg
+                    upload.save(update_fields=['status', 'error_log', 'updated_at'])
+                    return {'status': 'failed', 'error': error_msg}
+                columns_validated = True
+
+            processed, errors = _process_chunk(
+                chunk_df, upload, chunk_start, store_map, product_map
+            )
+            chunk_start += len(chunk_df)
+            chunk_index += 1
             processed_count += processed
             error_count += errors
-            
-            # Update progress
-            upload.processed_records = processed_count
-            upload.error_records = error_count
-            upload.save()
-            
-            # Update task progress
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'processed': processed_count,
-                    'total': upload.total_records,
-                    'errors': error_count
-                }
-            )
+
+            # Persist progress every 10th chunk with a targeted UPDATE rather
+            # than a full-row save per chunk; the final counts are written
+            # with the completion status below
+            if chunk_index % 10 == 0:
+                DataUpload.objects.filter(pk=upload.pk).update(
+                    processed_records=processed_count,
+                    error_records=error_count
+                )
+
+            # Coalesce progress messages: one per 10 chunks or 2 seconds,
+            # not one broker round-trip per chunk
+            if chunk_index % 10 == 0 or time.monotonic() - last_progress_emit > 2:
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'processed': processed_count,
+                        'total': upload.total_records,
+                        'errors': error_count
+                    }
+                )
+                last_progress_emit = time.monotonic()
         
         upload.status = 'completed'
-        upload.save()
+        upload.processed_records = processed_count
+        upload.error_records = error_count
+        upload.save(update_fields=['status', 'processed_records', 'error_records', 'updated_at'])
         
         logger.info(f"Upload {upload_id} completed: {processed_count} processed, {error_count} errors")
         
@@ -88,69 +179,182 @@ def process_data_upload(self, upload_id):
             upload = DataUpload.objects.get(id=upload_id)
             upload.status = 'failed'
             upload.error_log = str(e)
-            upload.save()
+            upload.save(update_fields=['status', 'error_log', 'updated_at'])
         except:
             pass
         
         return {'status': 'failed', 'error': str(e)}
 
-def _process_chunk(chunk_df, upload, chunk_start):
+@shared_task
+def process_upload_chunk(upload_id, chunk_start, chunk_size):
+    """Process one CSV row range of an upload; fanned out by process_data_upload"""
+    upload = DataUpload.objects.get(id=upload_id)
+    chunk_df = pd.read_csv(
+        upload.file.path,
+        skiprows=range(1, chunk_start + 1),
+        nrows=chunk_size,
+        dtype=CSV_DTYPES
+    )
+
+    processed, errors = _process_chunk(chunk_df, upload, chunk_start)
+
+    # Counter increments are atomic F() updates so concurrent chunk tasks
+    # don't clobber each other's progress
+    DataUpload.objects.filter(pk=upload.pk).update(
+        processed_records=F('processed_records') + processed,
+        error_records=F('error_records') + errors
+    )
+
+    return {'processed': processed, 'errors': errors}
+
+@shared_task
+def finalize_upload(results, upload_id):
+    """Chord callback: mark an upload completed once all chunks have landed"""
+    processed_count = sum(result['processed'] for result in results)
+    error_count = sum(result['errors'] for result in results)
+
+    upload = DataUpload.objects.get(id=upload_id)
+    upload.status = 'completed'
+    upload.processed_records = processed_count
+    upload.error_records = error_count
+    upload.save(update_fields=['status', 'processed_records', 'error_records', 'updated_at'])
+
+    logger.info(f"Upload {upload_id} completed: {processed_count} processed, {error_count} errors")
+
+    return {
+        'status': 'completed',
+        'processed': processed_count,
+        'errors': error_count,
+        'total': upload.total_records
+    }
+
+@shared_task
+def fail_upload(upload_id, request, exc, traceback):
+    """Chord errback: mark the upload failed when any chunk task raises.
+
+    Without this the finalize callback never runs and the row would sit
+    at 'processing' forever.
+    """
+    DataUpload.objects.filter(id=upload_id).update(
+        status='failed',
+        error_log=f"Chunk processing failed: {exc!r}",
+        updated_at=timezone.now()
+    )
+    logger.error(f"Upload {upload_id} failed: {exc!r}")
+
+def _extend_natural_key_map(model, key_field, keys, name_prefix, key_map):
+    """Ensure every key resolves to a PK in key_map, bulk-creating missing rows.
+
+    The map persists across chunks, so repeated store/sku IDs cost a dict
+    lookup instead of a query per chunk.
+    """
+    unseen = [key for key in keys if key not in key_map]
+    if not unseen:
+        return
+    existing = dict(
+        model.objects.filter(**{f'{key_field}__in': unseen}).values_list(key_field, 'pk')
+    )
+    to_create = [key for key in unseen if key not in existing]
+    if to_create:
+        model.objects.bulk_create(
+            [model(**{key_field: key, 'name': f"{name_prefix} {key}"}) for key in to_create],
+            ignore_conflicts=True
+        )
+        existing.update(
+            model.objects.filter(**{f'{key_field}__in': to_create}).values_list(key_field, 'pk')
+        )
+    key_map.update(existing)
+
+def _upsert_sales_data(sales_objects):
+    """Upsert a batch of SalesData rows in one multi-row statement"""
+    upsert_kwargs = {
+        'update_conflicts': True,
+        'update_fields': ['sales', 'price', 'on_hand', 'promotions_flag', 'created_by'],
+        'batch_size': 1000,
+    }
+    # MySQL infers the conflict target; backends like Postgres/SQLite need it
+    if connection.features.supports_update_conflicts_with_target:
+        upsert_kwargs['unique_fields'] = ['store', 'product', 'date']
+    SalesData.objects.bulk_create(sales_objects, **upsert_kwargs)
+
+def _process_chunk(chunk_df, upload, chunk_start, store_map=None, product_map=None):
     """Process a chunk of data"""
     processed_count = 0
     error_count = 0
-    
+    validation_errors = []
+    sales_objects = []
+
+    # Resolve store/product PKs for the chunk, reusing the caller's maps so
+    # IDs seen in earlier chunks don't hit the database again
+    if store_map is None:
+        store_map = {}
+    if product_map is None:
+        product_map = {}
+    _extend_natural_key_map(
+        Store, 'store_id', chunk_df['store_id'].astype(str).unique(), 'Store', store_map
+    )
+    _extend_natural_key_map(
+        Product, 'sku_id', chunk_df['sku_id'].astype(str).unique(), 'Product', product_map
+    )
+
+    # Parse and validate all columns in one vectorized pass instead of a
+    # Series-per-row iterrows() loop
+    row_numbers = chunk_df.index.to_numpy()
+    store_keys = chunk_df['store_id'].astype(str).to_numpy()
+    sku_keys = chunk_df['sku_id'].astype(str).to_numpy()
+    dates = pd.to_datetime(chunk_df['date'], errors='coerce')
+    sales_num = pd.to_numeric(chunk_df['sales'], errors='coerce')
+    price_num = pd.to_numeric(chunk_df['price'], errors='coerce')
+    on_hand_num = pd.to_numeric(chunk_df['on_hand'], errors='coerce')
+
+    # A row is invalid when its date is unparseable or a numeric column holds
+    # a non-numeric value; missing values keep the old per-row defaults
+    invalid_mask = (
+        dates.isna()
+        | (chunk_df['sales'].notna() & sales_num.isna())
+        | (chunk_df['price'].notna() & price_num.isna())
+        | (chunk_df['on_hand'].notna() & on_hand_num.isna())
+    ).to_numpy()
+
+    date_values = dates.dt.date.to_numpy()
+    sales_values = sales_num.fillna(0.0).to_numpy()
+    price_values = price_num.fillna(0.0).to_numpy()
+    on_hand_values = on_hand_num.fillna(0).astype(int).to_numpy()
+    promo_values = chunk_df['promotions_flag'].fillna(False).astype(bool).to_numpy()
+
     with transaction.atomic():
-        for idx, row in chunk_df.iterrows():
-            try:
-                # Validate and get/create store
-                store, created = Store.objects.get_or_create(
-                    store_id=str(row['store_id']),
-                    defaults={'name': f"Store {row['store_id']}"}
-                )
-                
-                # Validate and get/create product
-                product, created = Product.objects.get_or_create(
-                    sku_id=str(row['sku_id']),
-                    defaults={'name': f"Product {row['sku_id']}"}
-                )
-                
-                # Parse date
-                date_value = pd.to_datetime(row['date']).date()
-                
-                # Validate numeric fields
-                sales = float(row['sales']) if pd.notna(row['sales']) else 0.0
-                price = float(row['price']) if pd.notna(row['price']) else 0.0
-                on_hand = int(row['on_hand']) if pd.notna(row['on_hand']) else 0
-                promotions_flag = bool(row['promotions_flag']) if pd.notna(row['promotions_flag']) else False
-                
-                # Create or update sales data
-                SalesData.objects.update_or_create(
-                    store=store,
-                    product=product,
-                    date=date_value,
-                    defaults={
-                        'sales': sales,
-                        'price': price,
-                        'on_hand': on_hand,
-                        'promotions_flag': promotions_flag,
-                        'created_by': upload.created_by
-                    }
-                )
-                
-                processed_count += 1
-                
-            except Exception as e:
+        for i in range(len(chunk_df)):
+            if invalid_mask[i]:
                 error_count += 1
-                
-                # Log validation error
-                DataValidationError.objects.create(
+                validation_errors.append(DataValidationError(
                     upload=upload,
-                    row_number=chunk_start + idx + 1,
-                    error_type=type(e).__name__,
-                    error_message=str(e),
-                    raw_value=str(row.to_dict())
-                )
-    
+                    row_number=chunk_start + row_numbers[i] + 1,
+                    error_type='ValueError',
+                    error_message='Unparseable date or non-numeric value',
+                    raw_value=str(chunk_df.iloc[i].to_dict())
+                ))
+                continue
+
+            sales_objects.append(SalesData(
+                store_id=store_map[store_keys[i]],
+                product_id=product_map[sku_keys[i]],
+                date=date_values[i],
+                sales=sales_values[i],
+                price=price_values[i],
+                on_hand=on_hand_values[i],
+                promotions_flag=promo_values[i],
+                created_by=upload.created_by
+            ))
+            processed_count += 1
+
+        if sales_objects:
+            _upsert_sales_data(sales_objects)
+
+        if validation_errors:
+            DataValidationError.objects.bulk_create(
+                validation_errors, batch_size=1000
+            )
+
     return processed_count, error_count
 
 @shared_task
@@ -169,27 +373,43 @@ def generate_data_quality_report(date_from, date_to):
         if not queryset.exists():
             return {'status': 'completed', 'message': 'No data found for the specified date range'}
         
-        # Convert to DataFrame for analysis
-        data = list(queryset.values(
-            'date', 'sales', 'price', 'on_hand', 'promotions_flag',
-            'store__store_id', 'product__sku_id'
-        ))
-        df = pd.DataFrame(data)
-        
-        # Analyze data quality
-        total_records = len(df)
-        missing_values = df.isnull().sum().to_dict()
-        
-        # Detect outliers using IQR method
-        outliers = {}
-        for col in ['sales', 'price', 'on_hand']:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers[col] = len(df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)])
-        
-        # Check for duplicates
-        duplicates = df.duplicated(subset=['date', 'store__store_id', 'product__sku_id']).sum()
+        # Push row, null and duplicate counting to SQL; only the numeric
+        # columns needed for quantiles are pulled into pandas
+        stats = queryset.aggregate(
+            total_records=Count('id'),
+            missing_sales=Count('id', filter=Q(sales__isnull=True)),
+            missing_price=Count('id', filter=Q(price__isnull=True)),
+            missing_on_hand=Count('id', filter=Q(on_hand__isnull=True)),
+            missing_promotions=Count('id', filter=Q(promotions_flag__isnull=True)),
+        )
+        total_records = stats['total_records']
+        missing_values = {
+            'sales': stats['missing_sales'],
+            'price': stats['missing_price'],
+            'on_hand': stats['missing_on_hand'],
+            'promotions_flag': stats['missing_promotions'],
+        }
+
+        # Stream rows into the frame instead of materializing the queryset's
+        # result cache alongside the DataFrame copy
+        numeric_cols = ['sales', 'price', 'on_hand']
+        df = pd.DataFrame(
+            queryset.values_list(*numeric_cols).iterator(chunk_size=10000),
+            columns=numeric_cols
+        )
+        
+        # Detect outliers using the IQR method, vectorized across all three
+        # numeric columns in one pass
+        quantiles = df[numeric_cols].quantile([0.25, 0.75])
+        iqr = quantiles.loc[0.75] - quantiles.loc[0.25]
+        lower = quantiles.loc[0.25] - 1.5 * iqr
+        upper = quantiles.loc[0.75] + 1.5 * iqr
+        outlier_counts = ((df[numeric_cols] < lower) | (df[numeric_cols] > upper)).sum()
+        outliers = {col: int(count) for col, count in outlier_counts.items()}
+        
+        # Check for duplicates server-side: extra rows beyond the first per
+        # (date, store, product) group
+        duplicates = total_records - queryset.values('date', 'store', 'product').distinct().count()
         
         # Calculate quality score (0-100)
         missing_penalty = sum(missing_values.values()) / (total_records * len(missing_values)) * 30
@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Value, When
 from django.shortcuts import get_object_or_404
 from celery.result import AsyncResult
 from .models import SalesData, DataUpload, DataValidationError, DataQualityReport
@@ -18,7 +19,11 @@ logger = logging.getLogger(__name__)
 
 class SalesDataListView(generics.ListAPIView):
     """List sales data with filtering and pagination"""
-    queryset = SalesData.objects.all()
+    queryset = SalesData.objects.select_related('store', 'product').only(
+        'id', 'date', 'sales', 'price', 'on_hand', 'promotions_flag',
+        'created_at', 'updated_at',
+        'store__store_id', 'product__sku_id', 'product__name'
+    )
     serializer_class = SalesDataSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['store__store_id', 'product__sku_id', 'date', 'promotions_flag']
@@ -84,8 +89,21 @@ class DataUploadListView(generics.ListAPIView):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = DataUpload.objects.filter(created_by=self.request.user)
-        return queryset
+        # Compute progress in SQL so the serializer doesn't run a Python
+        # division per listed upload
+        return DataUpload.objects.filter(created_by=self.request.user).annotate(
+            progress_percentage=Case(
+                When(
+                    total_records__gt=0,
+                    then=ExpressionWrapper(
+                        100.0 * F('processed_records') / F('total_records'),
+                        output_field=FloatField()
+                    )
+                ),
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        )
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -105,14 +123,17 @@ def upload_status(request, upload_id):
         except Exception as e:
             logger.warning(f"Could not get task status: {str(e)}")
     
-    # Get validation errors if any
-    validation_errors = DataValidationError.objects.filter(upload=upload)[:10]  # Limit to first 10
-    
+    # Get validation errors if any - fetch one row past the display limit so
+    # has_more_errors doesn't need a second COUNT query
+    validation_errors = list(DataValidationError.objects.filter(upload=upload)[:11])
+    has_more_errors = len(validation_errors) > 10
+    validation_errors = validation_errors[:10]
+
     response_data = {
         'upload': DataUploadSerializer(upload).data,
         'task_status': task_status,
         'validation_errors': DataValidationErrorSerializer(validation_errors, many=True).data,
-        'has_more_errors': validation_errors.count() > 10
+        'has_more_errors': has_more_errors
     }
     
     return Response(response_data)
@@ -16,6 +16,54 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-process model cache keyed by MLModel id. Pickling a tree ensemble
+# through the Django cache backend costs more than reloading it, and the
+# mmap'd load below shares the array pages across workers anyway.
+_model_cache = {}
+
+# Cached identity of the active MLModel row; invalidated when a retrain
+# activates a new model so long-lived workers pick it up within the TTL
+# either way
+ACTIVE_MODEL_CACHE_KEY = 'forecasting:active_model'
+ACTIVE_MODEL_CACHE_TTL = 600
+
+_service = None
+
+def get_active_model_cached():
+    """Return the active model's id/name/version without a per-request query
+
+    The active model only changes at retrain time, so its identity is held
+    in the cache; ``save_model`` deletes the key after flipping is_active.
+    Returns None when no model is active.
+    """
+    return cache.get_or_set(
+        ACTIVE_MODEL_CACHE_KEY,
+        lambda: MLModel.objects.filter(
+            is_active=True
+        ).values('id', 'name', 'version').first(),
+        timeout=ACTIVE_MODEL_CACHE_TTL
+    )
+
+def get_ml_service():
+    """Return the process-wide MLService, reloading when the active model changes
+
+    Tasks and views share one service instance per process instead of paying
+    a model load per invocation; the active-model id is resolved through the
+    cache so the check is not a database query on every call.
+    """
+    global _service
+
+    active_model = get_active_model_cached()
+    active_model_id = active_model['id'] if active_model else None
+
+    loaded_model_id = (
+        _service.model_metadata.id
+        if _service is not None and _service.model_metadata else None
+    )
+    if _service is None or loaded_model_id != active_model_id:
+        _service = MLService()
+    return _service
+
 class MLService:
     """Service for ML model operations"""
     
@@ -24,6 +72,7 @@ class MLService:
         self.label_encoders = {}
         self.feature_columns = []
         self.model_metadata = None
+        self._encoder_index = {}
         self._load_active_model()
     
     def _load_active_model(self):
@@ -34,182 +83,366 @@ class MLService:
                 logger.warning("No active ML model found")
                 return
             
-            # Check cache first
-            cache_key = f"ml_model_{active_model.id}"
-            cached_model = cache.get(cache_key)
-            
+            # Check the per-process cache first
+            cached_model = _model_cache.get(active_model.id)
+
             if cached_model:
                 self.model = cached_model['model']
                 self.label_encoders = cached_model['label_encoders']
                 self.feature_columns = cached_model['feature_columns']
                 self.model_metadata = active_model
+                self._build_encoder_index()
                 logger.info(f"Loaded cached model: {active_model.name}")
                 return
-            
-            # Load from file
+
+            # Load from file; mmap keeps the estimator's arrays as shared
+            # read-only pages so concurrent workers don't each pay full RSS
             if os.path.exists(active_model.model_file_path):
-                model_data = joblib.load(active_model.model_file_path)
+                model_data = joblib.load(active_model.model_file_path, mmap_mode='r')
+                if not isinstance(model_data, dict):
+                    # Current layout: the joblib file holds only the booster;
+                    # encoder classes and feature columns sit in a sibling
+                    # npz so no sklearn objects are unpickled
+                    model_data = self._load_encoder_bundle(
+                        model_data, active_model.model_file_path
+                    )
                 self.model = model_data['model']
                 self.label_encoders = model_data['label_encoders']
                 self.feature_columns = model_data['feature_columns']
                 self.model_metadata = active_model
-                
-                # Cache the model
-                cache.set(cache_key, model_data, timeout=settings.PREDICTION_CACHE_TTL)
+                self._build_encoder_index()
+
+                # Cache for this process, dropping any previously active model
+                _model_cache.clear()
+                _model_cache[active_model.id] = model_data
                 logger.info(f"Loaded model from file: {active_model.name}")
             else:
                 logger.error(f"Model file not found: {active_model.model_file_path}")
                 
         except Exception as e:
             logger.error(f"Error loading ML model: {str(e)}")
-    
-    def _prepare_features_for_prediction(self, store_id, sku_id, target_date):
-        """Prepare features for a single prediction"""
+
+    @staticmethod
+    def _load_encoder_bundle(model, model_file_path):
+        """Rebuild the legacy bundle dict from a booster plus encoders.npz"""
+        from sklearn.preprocessing import LabelEncoder
+
+        archive = np.load(
+            os.path.join(os.path.dirname(model_file_path), 'encoders.npz'),
+            allow_pickle=False
+        )
+        label_encoders = {}
+        for key in archive.files:
+            if key.endswith('_classes'):
+                encoder = LabelEncoder()
+                encoder.classes_ = archive[key]
+                label_encoders[key[:-len('_classes')]] = encoder
+
+        return {
+            'model': model,
+            'label_encoders': label_encoders,
+            'feature_columns': [str(col) for col in archive['feature_columns']],
+        }
+
+    def _build_encoder_index(self):
+        """Precompute class-to-index maps for the label encoders
+
+        LabelEncoder.transform does a searchsorted per call; predictions only
+        need a single id's code, which a dict lookup answers directly.
+        """
+        self._encoder_index = {
+            name: {cls: idx for idx, cls in enumerate(encoder.classes_)}
+            for name, encoder in self.label_encoders.items()
+        }
+
+    def _encode(self, name, value):
+        """Encode a categorical id, falling back to 0 for unknown values"""
+        encoded = self._encoder_index.get(name, {}).get(value)
+        if encoded is None:
+            logger.warning(f"Unknown {name}: {value}")
+            return 0
+        return encoded
+
+    def _prepare_features_for_prediction(self, store_id, sku_id, target_date, history=None):
+        """Prepare features for a single prediction
+
+        ``history`` is an optional pre-fetched DataFrame of sales rows for
+        this (store, sku) pair; when provided the history window is sliced
+        from it instead of issuing a query per prediction.
+        """
+        return self._prepare_horizon_features(
+            store_id, sku_id, [target_date], history=history
+        )
+
+    def _prepare_horizon_features(self, store_id, sku_id, dates, history=None):
+        """Build the feature matrix for one (store, sku) pair across ``dates``
+
+        The lag, rolling and price/inventory features depend only on the
+        sales tail, which is the same for every forecast date in the
+        horizon; they are computed once and broadcast, so only the calendar
+        columns vary per row.
+        """
         try:
             # Get historical data for feature engineering
-            end_date = target_date
-            start_date = end_date - pd.Timedelta(days=60)  # Get 60 days of history
-            
-            # Query historical data
-            historical_data = SalesData.objects.filter(
-                store__store_id=store_id,
-                product__sku_id=sku_id,
-                date__range=[start_date, end_date]
-            ).order_by('date').values(
-                'date', 'sales', 'price', 'on_hand', 'promotions_flag'
-            )
-            
-            if not historical_data:
-                logger.warning(f"No historical data found for {store_id}-{sku_id}")
-                return None
-            
-            df = pd.DataFrame(historical_data)
-            df['store_id'] = store_id
-            df['sku_id'] = sku_id
-            
-            # Encode categorical variables
-            try:
-                df['store_id_encoded'] = self.label_encoders['store_id'].transform([store_id])[0]
-                df['sku_id_encoded'] = self.label_encoders['sku_id'].transform([sku_id])[0]
-            except (KeyError, ValueError) as e:
-                logger.warning(f"Unknown store_id or sku_id: {e}")
-                # Use a default encoding for unknown values
-                df['store_id_encoded'] = 0
-                df['sku_id_encoded'] = 0
-            
-            # Time-based features for target date
-            target_dt = pd.to_datetime(target_date)
-            df['day_of_week'] = target_dt.dayofweek
-            df['month'] = target_dt.month
-            df['day_of_month'] = target_dt.day
-            df['quarter'] = target_dt.quarter
-            
-            # Calculate lag features from most recent data
-            recent_sales = df['sales'].values
-            df['sales_lag_1'] = recent_sales[-1] if len(recent_sales) >= 1 else 0
-            df['sales_lag_7'] = recent_sales[-7] if len(recent_sales) >= 7 else recent_sales[-1] if len(recent_sales) >= 1 else 0
-            df['sales_lag_14'] = recent_sales[-14] if len(recent_sales) >= 14 else recent_sales[-1] if len(recent_sales) >= 1 else 0
-            df['sales_lag_30'] = recent_sales[-30] if len(recent_sales) >= 30 else recent_sales[-1] if len(recent_sales) >= 1 else 0
-            
-            # Rolling averages
-            df['sales_rolling_7'] = df['sales'].rolling(window=min(7, len(df))).mean().iloc[-1]
-            df['sales_rolling_14'] = df['sales'].rolling(window=min(14, len(df))).mean().iloc[-1]
-            df['sales_rolling_30'] = df['sales'].rolling(window=min(30, len(df))).mean().iloc[-1]
-            
-            # Price features (use most recent values)
-            recent_prices = df['price'].values
-            current_price = recent_prices[-1] if len(recent_prices) > 0 else 10.0
-            prev_price = recent_prices[-2] if len(recent_prices) > 1 else current_price
-            
-            df['price'] = current_price
-            df['price_change'] = (current_price - prev_price) / prev_price if prev_price > 0 else 0
-            df['price_rolling_7'] = df['price'].rolling(window=min(7, len(df))).mean().iloc[-1]
-            
-            # Inventory features (use most recent values)
-            recent_inventory = df['on_hand'].values
-            current_inventory = recent_inventory[-1] if len(recent_inventory) > 0 else 50
-            df['on_hand'] = current_inventory
-            df['inventory_ratio'] = df['sales_lag_1'] / (current_inventory + 1)
-            
-            # Promotion flag (assume no promotion for prediction)
-            df['promotions_flag'] = 0
-            
-            # Select features for prediction
-            feature_row = df[self.feature_columns].iloc[-1:].fillna(0)
-            
-            return feature_row
-            
+            end_date = max(dates)
+            start_date = min(dates) - pd.Timedelta(days=60)  # Get 60 days of history
+
+            if history is not None:
+                window = history[(history['date'] >= start_date) & (history['date'] <= end_date)]
+                if window.empty:
+                    logger.warning(f"No historical data found for {store_id}-{sku_id}")
+                    return None
+                sales = window['sales'].to_numpy(dtype=float)
+                prices = window['price'].to_numpy(dtype=float)
+                inventory = window['on_hand'].to_numpy(dtype=float)
+            else:
+                # Query historical data
+                rows = list(SalesData.objects.filter(
+                    store__store_id=store_id,
+                    product__sku_id=sku_id,
+                    date__range=[start_date, end_date]
+                ).order_by('date').values_list('sales', 'price', 'on_hand'))
+
+                if not rows:
+                    logger.warning(f"No historical data found for {store_id}-{sku_id}")
+                    return None
+
+                data = np.asarray(rows, dtype=float)
+                sales, prices, inventory = data[:, 0], data[:, 1], data[:, 2]
+
+            # Lag features from most recent data
+            sales_lag_1 = sales[-1]
+            sales_lag_7 = sales[-7] if len(sales) >= 7 else sales_lag_1
+            sales_lag_14 = sales[-14] if len(sales) >= 14 else sales_lag_1
+            sales_lag_30 = sales[-30] if len(sales) >= 30 else sales_lag_1
+
+            # Price and inventory features (use most recent values)
+            current_price = prices[-1]
+            prev_price = prices[-2] if len(prices) > 1 else current_price
+            current_inventory = inventory[-1]
+
+            # The history-derived features are scalar math over the numpy
+            # tail, assembled once as a dict and broadcast down the frame
+            features = {
+                'store_id_encoded': self._encode('store_id', store_id),
+                'sku_id_encoded': self._encode('sku_id', sku_id),
+                'price': current_price,
+                'price_change': (current_price - prev_price) / prev_price if prev_price > 0 else 0,
+                'price_rolling_7': prices[-7:].mean(),
+                'on_hand': current_inventory,
+                'inventory_ratio': sales_lag_1 / (current_inventory + 1),
+                # Promotion flag (assume no promotion for prediction)
+                'promotions_flag': 0,
+                'sales_lag_1': sales_lag_1,
+                'sales_lag_7': sales_lag_7,
+                'sales_lag_14': sales_lag_14,
+                'sales_lag_30': sales_lag_30,
+                # Rolling averages over the trailing windows
+                'sales_rolling_7': sales[-7:].mean(),
+                'sales_rolling_14': sales[-14:].mean(),
+                'sales_rolling_30': sales[-30:].mean(),
+            }
+
+            # Only the calendar columns differ per forecast date
+            frame = pd.DataFrame(features, index=range(len(dates)))
+            target_dts = pd.DatetimeIndex(pd.to_datetime(dates))
+            frame['day_of_week'] = target_dts.dayofweek
+            frame['month'] = target_dts.month
+            frame['day_of_month'] = target_dts.day
+            frame['quarter'] = target_dts.quarter
+
+            return frame.reindex(columns=self.feature_columns).fillna(0)
+
         except Exception as e:
             logger.error(f"Error preparing features: {str(e)}")
             return None
     
-    def predict_single(self, store_id, sku_id, target_date):
+    def predict_single(self, store_id, sku_id, target_date, history=None):
         """Make a single demand prediction"""
         if not self.model:
             logger.error("No model loaded")
             return None
-        
+
         try:
             # Convert string date to datetime if needed
             if isinstance(target_date, str):
                 target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
-            
+
             # Check cache first
             cache_key = f"prediction_{store_id}_{sku_id}_{target_date}"
             cached_prediction = cache.get(cache_key)
             if cached_prediction:
                 return cached_prediction
-            
+
             # Prepare features
-            features = self._prepare_features_for_prediction(store_id, sku_id, target_date)
+            features = self._prepare_features_for_prediction(store_id, sku_id, target_date, history=history)
             if features is None:
                 return None
             
             # Make prediction
             prediction = self.model.predict(features)[0]
-            prediction = max(0, prediction)  # Ensure non-negative
-            
-            # Calculate confidence interval (simple approach)
-            # In production, you might want to use prediction intervals from the model
-            std_error = prediction * 0.2  # Assume 20% standard error
-            confidence_interval = {
-                'lower': max(0, prediction - 1.96 * std_error),
-                'upper': prediction + 1.96 * std_error
-            }
-            
-            result = {
-                'demand': float(prediction),
-                'confidence_interval': confidence_interval
-            }
-            
+            result = self._build_prediction_result(prediction)
+
             # Cache the result
             cache.set(cache_key, result, timeout=settings.PREDICTION_CACHE_TTL)
             
-            logger.info(f"Prediction for {store_id}-{sku_id}-{target_date}: {prediction:.2f}")
+            logger.info(f"Prediction for {store_id}-{sku_id}-{target_date}: {result['demand']:.2f}")
             return result
             
         except Exception as e:
             logger.error(f"Prediction error: {str(e)}")
             return None
     
+    def predict_horizon(self, store_id, sku_id, date_list, history=None):
+        """Predict demand for one (store, sku) pair across a date horizon
+
+        Builds the base feature frame once, broadcasts the date-dependent
+        columns, and runs a single vectorized predict instead of one model
+        call per date. Returns a dict mapping each date to its result.
+        """
+        if not self.model:
+            logger.error("No model loaded")
+            return {}
+
+        dates = [
+            datetime.strptime(d, '%Y-%m-%d').date() if isinstance(d, str) else d
+            for d in date_list
+        ]
+        features = self._prepare_horizon_features(store_id, sku_id, dates, history=history)
+        if features is None:
+            return {}
+
+        raw_predictions = self.model.predict(features)
+        return {
+            single_date: self._build_prediction_result(raw_prediction)
+            for single_date, raw_prediction in zip(dates, raw_predictions)
+        }
+
+    @staticmethod
+    def _build_prediction_result(prediction):
+        """Clamp a raw model output and attach its confidence interval"""
+        prediction = max(0, float(prediction))  # Ensure non-negative
+
+        # Calculate confidence interval (simple approach)
+        # In production, you might want to use prediction intervals from the model
+        std_error = prediction * 0.2  # Assume 20% standard error
+        return {
+            'demand': prediction,
+            'confidence_interval': {
+                'lower': max(0, prediction - 1.96 * std_error),
+                'upper': prediction + 1.96 * std_error
+            }
+        }
+
+    def _fetch_batch_history(self, store_ids, sku_ids, start_date, end_date):
+        """Fetch sales history for all (store, sku) pairs in a single query
+
+        Returns a dict mapping (store_id, sku_id) to that pair's history
+        DataFrame, ready to pass to ``_prepare_features_for_prediction``.
+        """
+        history = pd.DataFrame(list(
+            SalesData.objects.filter(
+                store__store_id__in=store_ids,
+                product__sku_id__in=sku_ids,
+                date__range=[start_date, end_date]
+            ).order_by('date').values(
+                'store__store_id', 'product__sku_id',
+                'date', 'sales', 'price', 'on_hand', 'promotions_flag'
+            )
+        ))
+
+        if history.empty:
+            return {}
+
+        history = history.rename(columns={
+            'store__store_id': 'store_id',
+            'product__sku_id': 'sku_id',
+        })
+        return {
+            key: group
+            for key, group in history.groupby(['store_id', 'sku_id'], sort=False)
+        }
+
     def predict_batch(self, store_ids, sku_ids, date_range):
         """Make batch predictions"""
-        predictions = []
-        
+        if not self.model:
+            logger.error("No model loaded")
+            return []
+
+        dates = [d.date() for d in pd.date_range(date_range[0], date_range[1])]
+        if not dates:
+            return []
+
+        # One query covers every (store, sku, date) combination; each pair's
+        # history is then sliced from the grouped frame instead of being
+        # re-queried for every prediction
+        history_groups = self._fetch_batch_history(
+            store_ids, sku_ids, dates[0] - pd.Timedelta(days=60), dates[-1]
+        )
+
+        combos = []
         for store_id in store_ids:
             for sku_id in sku_ids:
-                for single_date in pd.date_range(date_range[0], date_range[1]):
-                    prediction = self.predict_single(store_id, sku_id, single_date.date())
-                    if prediction:
-                        predictions.append({
-                            'store_id': store_id,
-                            'sku_id': sku_id,
-                            'date': single_date.date(),
-                            'predicted_demand': prediction['demand'],
-                            'confidence_lower': prediction['confidence_interval']['lower'],
-                            'confidence_upper': prediction['confidence_interval']['upper']
-                        })
-        
+                if (store_id, sku_id) not in history_groups:
+                    logger.warning(f"No historical data found for {store_id}-{sku_id}")
+                    continue
+                combos.extend((store_id, sku_id, single_date) for single_date in dates)
+
+        # One pipelined get_many answers every cache hit instead of paying a
+        # backend round-trip per combination
+        cache_keys = {combo: f"prediction_{combo[0]}_{combo[1]}_{combo[2]}" for combo in combos}
+        cache_hits = cache.get_many(list(cache_keys.values()))
+
+        # Group the uncached dates per pair: the history-derived features
+        # are computed once per (store, sku) and broadcast across its
+        # horizon, then every pair's rows feed one N x F predict
+        results = {}
+        pending_dates = {}
+        for combo in combos:
+            cached_prediction = cache_hits.get(cache_keys[combo])
+            if cached_prediction:
+                results[combo] = cached_prediction
+            else:
+                pending_dates.setdefault(combo[:2], []).append(combo[2])
+
+        pending = []
+        for (store_id, sku_id), pair_dates in pending_dates.items():
+            features = self._prepare_horizon_features(
+                store_id, sku_id, pair_dates, history=history_groups[(store_id, sku_id)]
+            )
+            if features is not None:
+                pending.append((store_id, sku_id, pair_dates, features))
+
+        if pending:
+            feature_matrix = pd.concat(
+                [features for _, _, _, features in pending], ignore_index=True
+            )
+            raw_predictions = self.model.predict(feature_matrix)
+            new_results = {}
+            offset = 0
+            for store_id, sku_id, pair_dates, _ in pending:
+                pair_raw = raw_predictions[offset:offset + len(pair_dates)]
+                offset += len(pair_dates)
+                for single_date, raw_prediction in zip(pair_dates, pair_raw):
+                    combo = (store_id, sku_id, single_date)
+                    result = self._build_prediction_result(raw_prediction)
+                    results[combo] = result
+                    new_results[cache_keys[combo]] = result
+            cache.set_many(new_results, timeout=settings.PREDICTION_CACHE_TTL)
+
+        predictions = []
+        for store_id, sku_id, single_date in combos:
+            prediction = results.get((store_id, sku_id, single_date))
+            if prediction:
+                predictions.append({
+                    'store_id': store_id,
+                    'sku_id': sku_id,
+                    'date': single_date,
+                    'predicted_demand': prediction['demand'],
+                    'confidence_lower': prediction['confidence_interval']['lower'],
+                    'confidence_upper': prediction['confidence_interval']['upper']
+                })
+
         return predictions
     
     def is_model_loaded(self):
@@ -1,9 +1,9 @@
 from django.db import models
-from apps.core.models import BaseModel, Store, Product
+from apps.core.models import BaseModel, UUIDBaseModel, Store, Product
 from django.contrib.auth.models import User
 import json
 
-class MLModel(BaseModel):
+class MLModel(UUIDBaseModel):
     """Machine learning model metadata"""
     name = models.CharField(max_length=100)
     version = models.CharField(max_length=50)
@@ -22,7 +22,7 @@ class MLModel(BaseModel):
     def __str__(self):
         return f"{self.name} v{self.version}"
 
-class ForecastPrediction(BaseModel):
+class ForecastPrediction(UUIDBaseModel):
     """Store individual predictions"""
     model = models.ForeignKey(MLModel, on_delete=models.CASCADE)
     store = models.ForeignKey(Store, on_delete=models.CASCADE)
@@ -45,7 +45,7 @@ class ForecastPrediction(BaseModel):
     def __str__(self):
         return f"{self.store.store_id} - {self.product.sku_id} - {self.prediction_date}"
 
-class BatchPredictionJob(BaseModel):
+class BatchPredictionJob(UUIDBaseModel):
     """Track batch prediction jobs"""
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -71,7 +71,7 @@ class BatchPredictionJob(BaseModel):
     def __str__(self):
         return f"Batch Job {self.id} - {self.status}"
 
-class ModelPerformanceMetric(BaseModel):
+class ModelPerformanceMetric(UUIDBaseModel):
     """Track model performance over time"""
     model = models.ForeignKey(MLModel, on_delete=models.CASCADE)
     evaluation_date = models.DateField()
@@ -92,7 +92,26 @@ class ModelPerformanceMetric(BaseModel):
     def __str__(self):
         return f"{self.model.name} - {self.evaluation_date} - MAE: {self.mae:.2f}"
 
-class InventoryAlert(BaseModel):
+class StockoutSummary(BaseModel):
+    """Precomputed store/product pairs at stockout risk, refreshed by Celery.
+
+    Lets the dashboard answer "how many potential stockouts" with an indexed
+    count instead of a DISTINCT over the predictions table per request.
+    """
+    date = models.DateField()
+    store = models.ForeignKey(Store, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ['date', 'store', 'product']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.store.store_id} - {self.product.sku_id}"
+
+class InventoryAlert(UUIDBaseModel):
     """Inventory alerts based on predictions"""
     ALERT_TYPES = [
         ('stockout_risk', 'Stockout Risk'),
@@ -14,7 +14,11 @@ class MLModelSerializer(serializers.ModelSerializer):
     
     def get_performance_summary(self, obj):
         """Get latest performance metrics"""
-        latest_metric = ModelPerformanceMetric.objects.filter(model=obj).first()
+        if hasattr(obj, 'latest_metrics_list'):
+            # Set by the list view's Prefetch; newest first
+            latest_metric = obj.latest_metrics_list[0] if obj.latest_metrics_list else None
+        else:
+            latest_metric = ModelPerformanceMetric.objects.filter(model=obj).first()
         if latest_metric:
             return {
                 'mae': latest_metric.mae,
@@ -25,6 +29,19 @@ class MLModelSerializer(serializers.ModelSerializer):
             }
         return None
 
+class MLModelListSerializer(MLModelSerializer):
+    """List projection of MLModel without the large JSON columns
+
+    The hyperparameter and raw metric JSONs can dominate response size as
+    model history grows; the detail endpoint still returns them.
+    """
+    class Meta(MLModelSerializer.Meta):
+        fields = [
+            'id', 'name', 'version', 'algorithm', 'is_active',
+            'training_data_version', 'training_date', 'performance_summary',
+            'created_at'
+        ]
+
 class ForecastPredictionSerializer(serializers.ModelSerializer):
     store_id = serializers.CharField(source='store.store_id', read_only=True)
     sku_id = serializers.CharField(source='product.sku_id', read_only=True)
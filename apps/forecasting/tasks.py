@@ -2,133 +2,100 @@
 Celery tasks for forecasting operations
 """
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Abs
 from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import MLModel, ForecastPrediction, BatchPredictionJob, InventoryAlert
-from .ml_service import MLService
+from datetime import date, datetime, timedelta
+from .models import MLModel, ForecastPrediction, BatchPredictionJob, InventoryAlert, StockoutSummary
+from .ml_service import get_ml_service
 from apps.core.models import Store, Product
 from apps.data_management.models import SalesData
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Store slice handed to each batch_predict_chunk subtask
+STORES_PER_PREDICTION_CHUNK = 50
+
 @shared_task(bind=True)
 def batch_predict(self, job_id):
     """Execute batch prediction job"""
     try:
         job = BatchPredictionJob.objects.get(id=job_id)
         job.status = 'processing'
-        job.save()
+        job.save(update_fields=['status', 'updated_at'])
         
         logger.info(f"Starting batch prediction job {job_id}")
         
         # Initialize ML service
-        ml_service = MLService()
+        ml_service = get_ml_service()
         if not ml_service.is_model_loaded():
             raise Exception("No ML model available")
         
         # Get stores and products to predict
         stores = Store.objects.filter(is_active=True)
         products = Product.objects.filter(is_active=True)
-        
+
         if job.stores_filter:
             stores = stores.filter(store_id__in=job.stores_filter)
         if job.products_filter:
             products = products.filter(sku_id__in=job.products_filter)
-        
-        # Generate date range
-        current_date = job.prediction_date_start
-        dates = []
-        while current_date <= job.prediction_date_end:
-            dates.append(current_date)
-            current_date += timedelta(days=1)
-        
+
+        store_pks = dict(stores.values_list('store_id', 'pk'))
+        product_pks = dict(products.values_list('sku_id', 'pk'))
+
+        # Most (store, product) combinations never stock each other, and the
+        # model can only score pairs with sales history anyway - so size and
+        # scope the job by pairs active in the feature window rather than the
+        # full Cartesian product
+        active_pairs = set(SalesData.objects.filter(
+            date__gte=job.prediction_date_start - timedelta(days=60),
+            store_id__in=store_pks.values(),
+            product_id__in=product_pks.values()
+        ).values_list('store_id', 'product_id').distinct().iterator(chunk_size=10000))
+        active_store_pks = {pair[0] for pair in active_pairs}
+        active_product_pks = {pair[1] for pair in active_pairs}
+        active_store_ids = [sid for sid, pk in store_pks.items() if pk in active_store_pks]
+        active_sku_ids = [sku for sku, pk in product_pks.items() if pk in active_product_pks]
+
         # Calculate total predictions needed
-        total_predictions = len(stores) * len(products) * len(dates)
+        total_days = (job.prediction_date_end - job.prediction_date_start).days + 1
+        total_predictions = len(active_pairs) * total_days
         job.total_predictions = total_predictions
-        job.save()
-        
-        # Process predictions in batches
-        batch_size = 100
-        completed = 0
-        predictions_batch = []
-        
-        for store in stores:
-            for product in products:
-                for pred_date in dates:
-                    try:
-                        # Make prediction
-                        prediction_result = ml_service.predict_single(
-                            store.store_id, 
-                            product.sku_id, 
-                            pred_date
-                        )
-                        
-                        if prediction_result:
-                            # Create prediction record
-                            prediction = ForecastPrediction(
-                                model=job.model,
-                                store=store,
-                                product=product,
-                                prediction_date=pred_date,
-                                predicted_demand=prediction_result['demand'],
-                                confidence_interval_lower=prediction_result['confidence_interval']['lower'],
-                                confidence_interval_upper=prediction_result['confidence_interval']['upper']
-                            )
-                            predictions_batch.append(prediction)
-                        
-                        completed += 1
-                        
-                        # Bulk create when batch is full
-                        if len(predictions_batch) >= batch_size:
-                            ForecastPrediction.objects.bulk_create(
-                                predictions_batch, 
-                                ignore_conflicts=True
-                            )
-                            predictions_batch = []
-                            
-                            # Update progress
-                            job.completed_predictions = completed
-                            job.save()
-                            
-                            # Update task progress
-                            self.update_state(
-                                state='PROGRESS',
-                                meta={
-                                    'completed': completed,
-                                    'total': total_predictions,
-                                    'percentage': (completed / total_predictions) * 100
-                                }
-                            )
-                    
-                    except Exception as e:
-                        logger.error(f"Error predicting {store.store_id}-{product.sku_id}-{pred_date}: {str(e)}")
-                        continue
-        
-        # Create remaining predictions
-        if predictions_batch:
-            ForecastPrediction.objects.bulk_create(
-                predictions_batch, 
-                ignore_conflicts=True
-            )
-        
-        job.status = 'completed'
-        job.completed_predictions = completed
-        job.save()
-        
-        logger.info(f"Batch prediction job {job_id} completed: {completed}/{total_predictions}")
-        
-        # Generate alerts based on predictions
-        generate_inventory_alerts.delay(job_id)
-        
+        job.save(update_fields=['total_predictions', 'updated_at'])
+
+        self.update_state(
+            state='PROGRESS',
+            meta={'completed': 0, 'total': total_predictions, 'percentage': 0}
+        )
+
+        if not active_store_ids:
+            job.status = 'completed'
+            job.save(update_fields=['status', 'updated_at'])
+            return {'status': 'completed', 'completed': 0, 'total': total_predictions}
+
+        # Fan the store dimension out to the worker pool: each chunk scores
+        # its stores through the vectorized batch path and a chord callback
+        # finalizes the job once every chunk has landed
+        store_chunks = [
+            active_store_ids[i:i + STORES_PER_PREDICTION_CHUNK]
+            for i in range(0, len(active_store_ids), STORES_PER_PREDICTION_CHUNK)
+        ]
+        chord(
+            batch_predict_chunk.s(job_id, chunk, active_sku_ids)
+            for chunk in store_chunks
+        )(finalize_batch_prediction.s(job_id).on_error(fail_batch_prediction.s(job_id)))
+
         return {
-            'status': 'completed',
-            'completed': completed,
+            'status': 'dispatched',
+            'chunks': len(store_chunks),
             'total': total_predictions
         }
-        
+
     except Exception as e:
         logger.error(f"Batch prediction job {job_id} failed: {str(e)}")
         
@@ -136,12 +103,93 @@ def batch_predict(self, job_id):
             job = BatchPredictionJob.objects.get(id=job_id)
             job.status = 'failed'
             job.error_log = str(e)
-            job.save()
+            job.save(update_fields=['status', 'error_log', 'updated_at'])
         except:
             pass
         
         return {'status': 'failed', 'error': str(e)}
 
+@shared_task
+def batch_predict_chunk(job_id, store_ids, sku_ids):
+    """Score one store slice of a batch prediction job"""
+    job = BatchPredictionJob.objects.get(id=job_id)
+
+    ml_service = get_ml_service()
+    if not ml_service.is_model_loaded():
+        raise Exception("No ML model available")
+
+    store_pks = dict(
+        Store.objects.filter(store_id__in=store_ids).values_list('store_id', 'pk')
+    )
+    product_pks = dict(
+        Product.objects.filter(sku_id__in=sku_ids).values_list('sku_id', 'pk')
+    )
+
+    results = ml_service.predict_batch(
+        store_ids, sku_ids,
+        (job.prediction_date_start, job.prediction_date_end)
+    )
+
+    predictions_batch = [
+        ForecastPrediction(
+            model=job.model,
+            store_id=store_pks[result['store_id']],
+            product_id=product_pks[result['sku_id']],
+            prediction_date=result['date'],
+            predicted_demand=result['predicted_demand'],
+            confidence_interval_lower=result['confidence_lower'],
+            confidence_interval_upper=result['confidence_upper']
+        )
+        for result in results
+    ]
+    # One transaction per chunk: the insert and the progress bump share a
+    # single commit instead of paying two fsyncs
+    with transaction.atomic():
+        ForecastPrediction.objects.bulk_create(
+            predictions_batch, batch_size=1000, ignore_conflicts=True
+        )
+        # Atomic increment so parallel chunks don't clobber each other's progress
+        BatchPredictionJob.objects.filter(pk=job.pk).update(
+            completed_predictions=F('completed_predictions') + len(predictions_batch)
+        )
+
+    return len(predictions_batch)
+
+@shared_task
+def finalize_batch_prediction(chunk_counts, job_id):
+    """Chord callback: close out a batch job once all store chunks land"""
+    completed = sum(chunk_counts)
+
+    job = BatchPredictionJob.objects.get(id=job_id)
+    job.status = 'completed'
+    job.completed_predictions = completed
+    job.save(update_fields=['status', 'completed_predictions', 'updated_at'])
+
+    logger.info(f"Batch prediction job {job_id} completed: {completed}/{job.total_predictions}")
+
+    # Generate alerts based on predictions
+    generate_inventory_alerts.delay(job_id)
+
+    return {
+        'status': 'completed',
+        'completed': completed,
+        'total': job.total_predictions
+    }
+
+@shared_task
+def fail_batch_prediction(job_id, request, exc, traceback):
+    """Chord errback: mark the job failed when any store chunk raises.
+
+    Without this the finalize callback never runs and the job would sit
+    at 'processing' forever.
+    """
+    BatchPredictionJob.objects.filter(id=job_id).update(
+        status='failed',
+        error_log=f"Chunk prediction failed: {exc!r}",
+        updated_at=timezone.now()
+    )
+    logger.error(f"Batch prediction job {job_id} failed: {exc!r}")
+
 @shared_task(bind=True)
 def retrain_model(self, model_name=None, hyperparameters=None, data_date_from=None, data_date_to=None, user_id=None):
     """Retrain ML model"""
@@ -155,8 +203,8 @@ def retrain_model(self, model_name=None, hyperparameters=None, data_date_from=No
         forecaster = DemandForecaster(model_name=model_name)
         
         # Parse dates if provided
-        date_from = datetime.strptime(data_date_from, '%Y-%m-%d').date() if data_date_from else None
-        date_to = datetime.strptime(data_date_to, '%Y-%m-%d').date() if data_date_to else None
+        date_from = date.fromisoformat(data_date_from) if data_date_from else None
+        date_to = date.fromisoformat(data_date_to) if data_date_to else None
         
         # Train model
         self.update_state(state='PROGRESS', meta={'step': 'training'})
@@ -189,84 +237,103 @@ def generate_inventory_alerts(job_id=None):
         logger.info("Generating inventory alerts...")
         
         # Get recent predictions
-        cutoff_date = timezone.now().date() + timedelta(days=30)
-        predictions = ForecastPrediction.objects.filter(
+        today = timezone.now().date()
+        cutoff_date = today + timedelta(days=30)
+
+        # The threshold rules are pure relational filters, so evaluate them
+        # server-side: annotate each prediction with its pair's latest
+        # on-hand figure and let the database return only alert-worthy rows
+        latest_on_hand = Subquery(
+            SalesData.objects.filter(
+                store=OuterRef('store'), product=OuterRef('product')
+            ).order_by('-date').values('on_hand')[:1]
+        )
+        # One row per (store, product) pair - a 30-day horizon otherwise
+        # yields up to 30 rows per pair - using worst-case demand for the
+        # threshold check
+        candidates = ForecastPrediction.objects.filter(
             prediction_date__lte=cutoff_date,
-            prediction_date__gte=timezone.now().date()
-        ).select_related('store', 'product')
-        
-        alerts_created = 0
-        
-        for prediction in predictions:
-            try:
-                # Get current inventory
-                latest_sales = SalesData.objects.filter(
-                    store=prediction.store,
-                    product=prediction.product
-                ).order_by('-date').first()
-                
-                if not latest_sales:
-                    continue
-                
-                current_inventory = latest_sales.on_hand
-                predicted_demand = prediction.predicted_demand
-                
+            prediction_date__gte=today
+        ).values('store_id', 'product_id').annotate(
+            max_demand=Max('predicted_demand'),
+            latest_on_hand=latest_on_hand
+        ).filter(
+            Q(latest_on_hand__lt=F('max_demand') * 1.5)
+            | Q(latest_on_hand__gt=F('max_demand') * 4.0)
+        )
+
+        # Pre-fetch open alerts so dedup is a set lookup, not a
+        # get_or_create query per prediction
+        open_alerts = set(InventoryAlert.objects.filter(
+            is_acknowledged=False
+        ).values_list('store_id', 'product_id', 'alert_type'))
+
+        candidate_rows = list(candidates.iterator(chunk_size=2000))
+        new_alerts = []
+
+        if candidate_rows:
+            # Vectorize the per-row arithmetic: days-to-stockout and the
+            # priority bucketing become single array ops instead of Python
+            # bytecode per candidate
+            inventory = np.array([row['latest_on_hand'] for row in candidate_rows], dtype=float)
+            demand = np.array([row['max_demand'] for row in candidate_rows], dtype=float)
+
+            stockout_mask = inventory < demand * 1.5  # Safety stock threshold
+            days_until_stockout = np.maximum(
+                1, (inventory / np.maximum(demand, 1)).astype(int)
+            )
+            priorities = np.select(
+                [days_until_stockout <= 3, days_until_stockout <= 7, days_until_stockout <= 14],
+                ['critical', 'high', 'medium'],
+                default='low'
+            )
+
+            for i, row in enumerate(candidate_rows):
+                pair = (row['store_id'], row['product_id'])
+                current_inventory = row['latest_on_hand']
+                predicted_demand = row['max_demand']
+
                 # Check for stockout risk
-                if current_inventory < predicted_demand * 1.5:  # Safety stock threshold
-                    # Calculate stockout date
-                    days_until_stockout = max(1, int(current_inventory / max(predicted_demand, 1)))
-                    stockout_date = timezone.now().date() + timedelta(days=days_until_stockout)
-                    
-                    # Determine priority
-                    if days_until_stockout <= 3:
-                        priority = 'critical'
-                    elif days_until_stockout <= 7:
-                        priority = 'high'
-                    elif days_until_stockout <= 14:
-                        priority = 'medium'
-                    else:
-                        priority = 'low'
-                    
-                    # Create alert if it doesn't exist
-                    alert, created = InventoryAlert.objects.get_or_create(
-                        store=prediction.store,
-                        product=prediction.product,
+                if stockout_mask[i]:
+                    if pair + ('stockout_risk',) in open_alerts:
+                        continue
+                    open_alerts.add(pair + ('stockout_risk',))
+
+                    days = int(days_until_stockout[i])
+                    new_alerts.append(InventoryAlert(
+                        store_id=row['store_id'],
+                        product_id=row['product_id'],
                         alert_type='stockout_risk',
-                        is_acknowledged=False,
-                        defaults={
-                            'priority': priority,
-                            'message': f"Potential stockout in {days_until_stockout} days. Current inventory: {current_inventory}, Predicted demand: {predicted_demand:.1f}",
-                            'predicted_stockout_date': stockout_date,
-                            'current_inventory': current_inventory,
-                            'recommended_action': f"Reorder {int(predicted_demand * 2)} units to maintain safety stock"
-                        }
-                    )
-                    
-                    if created:
-                        alerts_created += 1
-                
-                # Check for overstock
-                elif current_inventory > predicted_demand * 4:  # Overstock threshold
-                    alert, created = InventoryAlert.objects.get_or_create(
-                        store=prediction.store,
-                        product=prediction.product,
+                        priority=str(priorities[i]),
+                        message=f"Potential stockout in {days} days. Current inventory: {current_inventory}, Predicted demand: {predicted_demand:.1f}",
+                        predicted_stockout_date=today + timedelta(days=days),
+                        current_inventory=current_inventory,
+                        recommended_action=f"Reorder {int(predicted_demand * 2)} units to maintain safety stock"
+                    ))
+
+                # Otherwise overstock: the database filter only returns rows
+                # matching one of the two thresholds
+                else:
+                    if pair + ('overstock_risk',) in open_alerts:
+                        continue
+                    open_alerts.add(pair + ('overstock_risk',))
+
+                    new_alerts.append(InventoryAlert(
+                        store_id=row['store_id'],
+                        product_id=row['product_id'],
                         alert_type='overstock_risk',
-                        is_acknowledged=False,
-                        defaults={
-                            'priority': 'low',
-                            'message': f"Potential overstock. Current inventory: {current_inventory}, Predicted demand: {predicted_demand:.1f}",
-                            'current_inventory': current_inventory,
-                            'recommended_action': "Consider promotional activities to reduce inventory"
-                        }
-                    )
-                    
-                    if created:
-                        alerts_created += 1
-                        
-            except Exception as e:
-                logger.error(f"Error generating alert for {prediction.store.store_id}-{prediction.product.sku_id}: {str(e)}")
-                continue
-        
+                        priority='low',
+                        message=f"Potential overstock. Current inventory: {current_inventory}, Predicted demand: {predicted_demand:.1f}",
+                        current_inventory=current_inventory,
+                        recommended_action="Consider promotional activities to reduce inventory"
+                    ))
+
+        if new_alerts:
+            InventoryAlert.objects.bulk_create(
+                new_alerts, batch_size=1000, ignore_conflicts=True
+            )
+        alerts_created = len(new_alerts)
+
         logger.info(f"Generated {alerts_created} new inventory alerts")
         return {'alerts_created': alerts_created}
         
@@ -274,6 +341,42 @@ def generate_inventory_alerts(job_id=None):
         logger.error(f"Error generating inventory alerts: {str(e)}")
         return {'error': str(e)}
 
+@shared_task
+def refresh_stockout_summary():
+    """Refresh the precomputed stockout summary for the dashboard"""
+    try:
+        today = timezone.now().date()
+        cutoff_date = today + timedelta(days=30)
+
+        # order_by() clears Meta.ordering - otherwise prediction_date is
+        # added to the SELECT DISTINCT and every pair comes back once per
+        # horizon date
+        pairs = ForecastPrediction.objects.filter(
+            prediction_date__range=[today, cutoff_date],
+            predicted_demand__gt=0  # Simple stockout logic - can be enhanced
+        ).order_by().values_list('store_id', 'product_id').distinct()
+
+        summaries = [
+            StockoutSummary(date=today, store_id=store_id, product_id=product_id)
+            for store_id, product_id in pairs
+        ]
+
+        with transaction.atomic():
+            StockoutSummary.objects.filter(date=today).delete()
+            StockoutSummary.objects.bulk_create(
+                summaries, batch_size=1000, ignore_conflicts=True
+            )
+
+        # Drop stale snapshots from previous days
+        StockoutSummary.objects.filter(date__lt=today).delete()
+
+        logger.info(f"Refreshed stockout summary: {len(summaries)} pairs at risk")
+        return {'status': 'completed', 'pairs': len(summaries)}
+
+    except Exception as e:
+        logger.error(f"Error refreshing stockout summary: {str(e)}")
+        return {'status': 'failed', 'error': str(e)}
+
 @shared_task
 def model_health_check():
     """Check model performance and trigger retraining if needed"""
@@ -301,24 +404,22 @@ def model_health_check():
             created_at__gte=timezone.now() - timedelta(days=7)
         )
         
-        if recent_predictions.exists():
-            # Calculate recent MAPE
-            total_error = 0
-            total_actual = 0
-            
-            for pred in recent_predictions:
-                error = abs(pred.predicted_demand - pred.actual_demand)
-                total_error += error
-                total_actual += pred.actual_demand
-            
-            if total_actual > 0:
-                recent_mape = (total_error / total_actual) * 100
-                threshold = getattr(settings, 'MODEL_RETRAIN_THRESHOLD', 15) * 100  # Convert to percentage
-                
-                if recent_mape > threshold:
-                    logger.info(f"Model performance degraded (MAPE: {recent_mape:.2f}%), triggering retraining")
-                    retrain_model.delay()
-                    return {'status': 'retraining_triggered', 'reason': 'performance_degradation', 'mape': recent_mape}
+        # Compute recent MAPE in one DB-side aggregate instead of pulling
+        # every prediction row into Python
+        accuracy = recent_predictions.aggregate(
+            total_error=Sum(Abs(F('predicted_demand') - F('actual_demand'))),
+            total_actual=Sum('actual_demand')
+        )
+        total_actual = accuracy['total_actual'] or 0
+
+        if total_actual > 0:
+            recent_mape = ((accuracy['total_error'] or 0) / total_actual) * 100
+            threshold = getattr(settings, 'MODEL_RETRAIN_THRESHOLD', 15) * 100  # Convert to percentage
+
+            if recent_mape > threshold:
+                logger.info(f"Model performance degraded (MAPE: {recent_mape:.2f}%), triggering retraining")
+                retrain_model.delay()
+                return {'status': 'retraining_triggered', 'reason': 'performance_degradation', 'mape': recent_mape}
         
         logger.info("Model health check passed")
         return {'status': 'healthy'}
@@ -6,6 +6,7 @@ app_name = 'forecasting'
 urlpatterns = [
     # Models
     path('models/', views.MLModelListView.as_view(), name='model-list'),
+    path('models/<uuid:pk>/', views.MLModelDetailView.as_view(), name='model-detail'),
     path('models/retrain/', views.trigger_model_retrain, name='model-retrain'),
     path('models/performance/', views.ModelPerformanceListView.as_view(), name='model-performance'),
     
@@ -1,8 +1,11 @@
 from rest_framework import generics, status, filters
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from celery.result import AsyncResult
@@ -11,26 +14,59 @@ from .models import (
     ModelPerformanceMetric, InventoryAlert
 )
 from .serializers import (
-    MLModelSerializer, ForecastPredictionSerializer,
+    MLModelSerializer, MLModelListSerializer, ForecastPredictionSerializer,
     BatchPredictionJobSerializer, ModelPerformanceMetricSerializer,
     InventoryAlertSerializer, PredictionRequestSerializer, ModelRetrainSerializer
 )
 from .tasks import batch_predict, retrain_model
-from .ml_service import MLService
+from .ml_service import get_active_model_cached, get_ml_service
+from apps.core.utils import get_accessible_store_ids
 import logging
 
 logger = logging.getLogger(__name__)
 
+class ModelListPagination(PageNumberPagination):
+    """Smaller pages for model listings, which carry metric summaries"""
+    page_size = 25
+
 class MLModelListView(generics.ListAPIView):
     """List ML models with performance metrics"""
+    # One prefetch feeds every row's performance_summary instead of a
+    # metrics query per listed model; the JSON columns are deferred and
+    # served by the detail endpoint instead
+    queryset = MLModel.objects.defer(
+        'hyperparameters', 'performance_metrics'
+    ).prefetch_related(
+        Prefetch(
+            'modelperformancemetric_set',
+            queryset=ModelPerformanceMetric.objects.order_by('-evaluation_date'),
+            to_attr='latest_metrics_list'
+        )
+    )
+    serializer_class = MLModelListSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ModelListPagination
+    ordering = ['-training_date']
+
+class MLModelDetailView(generics.RetrieveAPIView):
+    """Retrieve a single ML model including its full JSON fields"""
     queryset = MLModel.objects.all()
     serializer_class = MLModelSerializer
     permission_classes = [IsAuthenticated]
-    ordering = ['-training_date']
 
 class ForecastPredictionListView(generics.ListAPIView):
     """List forecast predictions with filtering"""
-    queryset = ForecastPrediction.objects.all()
+    # The serializer reads store/product/model attributes per row, so join
+    # them up front instead of emitting a query per object
+    # only() trims the joined rows to the columns the serializer reads
+    queryset = ForecastPrediction.objects.select_related(
+        'store', 'product', 'model'
+    ).only(
+        'id', 'prediction_date', 'predicted_demand',
+        'confidence_interval_lower', 'confidence_interval_upper',
+        'actual_demand', 'created_at',
+        'store__store_id', 'product__sku_id', 'product__name', 'model__name'
+    )
     serializer_class = ForecastPredictionSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = [
@@ -42,14 +78,12 @@ class ForecastPredictionListView(generics.ListAPIView):
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        
+
         # Filter by user's accessible stores if not admin
-        user_profile = getattr(self.request.user, 'userprofile', None)
-        if user_profile and user_profile.role != 'admin':
-            accessible_stores = user_profile.stores.all()
-            if accessible_stores.exists():
-                queryset = queryset.filter(store__in=accessible_stores)
-        
+        accessible_ids = get_accessible_store_ids(self.request.user)
+        if accessible_ids:
+            queryset = queryset.filter(store_id__in=accessible_ids)
+
         return queryset
 
 @api_view(['GET'])
@@ -66,15 +100,16 @@ def predict_demand(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Get active model
-        active_model = MLModel.objects.filter(is_active=True).first()
+        # Active model identity comes from the cache; it only changes at
+        # retrain time, so no DB round-trip per prediction request
+        active_model = get_active_model_cached()
         if not active_model:
             return Response({
                 'error': 'No active model available'
             }, status=status.HTTP_404_NOT_FOUND)
-        
+
         # Use ML service for prediction
-        ml_service = MLService()
+        ml_service = get_ml_service()
         prediction = ml_service.predict_single(store_id, sku_id, date)
         
         if prediction is None:
@@ -91,8 +126,8 @@ def predict_demand(request):
             'date': date,
             'predicted_demand': prediction['demand'],
             'confidence_interval': prediction.get('confidence_interval'),
-            'model_name': active_model.name,
-            'model_version': active_model.version,
+            'model_name': active_model['name'],
+            'model_version': active_model['version'],
             'generated_at': timezone.now()
         })
         
@@ -103,6 +138,11 @@ def predict_demand(request):
             'details': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _enqueue_batch_predict(job_id):
+    """Submit a committed batch job to Celery and record its task id"""
+    task = batch_predict.delay(job_id)
+    BatchPredictionJob.objects.filter(id=job_id).update(celery_task_id=task.id)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def batch_predict_demand(request):
@@ -115,34 +155,32 @@ def batch_predict_demand(request):
     data = serializer.validated_data
     
     try:
-        # Get active model
-        active_model = MLModel.objects.filter(is_active=True).first()
+        # Get active model from the cache (only the pk feeds the job FK)
+        active_model = get_active_model_cached()
         if not active_model:
             return Response({
                 'error': 'No active model available'
             }, status=status.HTTP_404_NOT_FOUND)
-        
-        # Create batch job
-        batch_job = BatchPredictionJob.objects.create(
-            model=active_model,
-            prediction_date_start=data['date_from'],
-            prediction_date_end=data['date_to'],
-            stores_filter=data.get('store_ids', []),
-            products_filter=data.get('sku_ids', []),
-            created_by=request.user
-        )
-        
-        # Start async processing
-        task = batch_predict.delay(batch_job.id)
-        batch_job.celery_task_id = task.id
-        batch_job.save()
-        
+
+        # Create the job and enqueue only after the row commits, so a fast
+        # worker can't pick up a job id that isn't visible yet; the task id
+        # lands via a targeted UPDATE instead of re-saving the row
+        with transaction.atomic():
+            batch_job = BatchPredictionJob.objects.create(
+                model_id=active_model['id'],
+                prediction_date_start=data['date_from'],
+                prediction_date_end=data['date_to'],
+                stores_filter=data.get('store_ids', []),
+                products_filter=data.get('sku_ids', []),
+                created_by=request.user
+            )
+            transaction.on_commit(lambda: _enqueue_batch_predict(batch_job.id))
+
         logger.info(f"Batch prediction job {batch_job.id} started",
                    extra={'user_id': request.user.id})
-        
+
         return Response({
             'job_id': batch_job.id,
-            'task_id': task.id,
             'status': 'processing',
             'message': 'Batch prediction started'
         }, status=status.HTTP_202_ACCEPTED)
@@ -161,7 +199,9 @@ class BatchPredictionJobListView(generics.ListAPIView):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        return BatchPredictionJob.objects.filter(created_by=self.request.user)
+        return BatchPredictionJob.objects.filter(
+            created_by=self.request.user
+        ).select_related('model')
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -173,9 +213,11 @@ def batch_job_status(request, job_id):
         created_by=request.user
     )
     
-    # Check Celery task status if available
+    # Check Celery task status if available; terminal jobs carry their
+    # final state on the row, so skip the result-backend round-trip the
+    # UI would otherwise pay on every poll
     task_status = None
-    if job.celery_task_id:
+    if job.celery_task_id and job.status in ('pending', 'processing'):
         try:
             task_result = AsyncResult(job.celery_task_id)
             task_status = {
@@ -233,16 +275,26 @@ def trigger_model_retrain(request):
 
 class ModelPerformanceListView(generics.ListAPIView):
     """List model performance metrics"""
-    queryset = ModelPerformanceMetric.objects.all()
+    queryset = ModelPerformanceMetric.objects.select_related('model')
     serializer_class = ModelPerformanceMetricSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ModelListPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['model__id', 'model__name']
     ordering = ['-evaluation_date']
 
 class InventoryAlertListView(generics.ListAPIView):
     """List inventory alerts"""
-    queryset = InventoryAlert.objects.all()
+    # Joined User rows are wide; only() keeps just the username column
+    queryset = InventoryAlert.objects.select_related(
+        'store', 'product', 'acknowledged_by'
+    ).only(
+        'id', 'alert_type', 'priority', 'message', 'predicted_stockout_date',
+        'current_inventory', 'recommended_action', 'is_acknowledged',
+        'acknowledged_at', 'created_at',
+        'store__store_id', 'product__sku_id', 'product__name',
+        'acknowledged_by__username'
+    )
     serializer_class = InventoryAlertSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = [
@@ -254,35 +306,35 @@ class InventoryAlertListView(generics.ListAPIView):
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        
+
         # Filter by user's accessible stores if not admin
-        user_profile = getattr(self.request.user, 'userprofile', None)
-        if user_profile and user_profile.role != 'admin':
-            accessible_stores = user_profile.stores.all()
-            if accessible_stores.exists():
-                queryset = queryset.filter(store__in=accessible_stores)
-        
+        accessible_ids = get_accessible_store_ids(self.request.user)
+        if accessible_ids:
+            queryset = queryset.filter(store_id__in=accessible_ids)
+
         return queryset
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def acknowledge_alert(request, alert_id):
     """Acknowledge an inventory alert"""
-    alert = get_object_or_404(InventoryAlert, id=alert_id)
-    
-    # Check if user has access to this store
-    user_profile = getattr(request.user, 'userprofile', None)
-    if user_profile and user_profile.role != 'admin':
-        accessible_stores = user_profile.stores.all()
-        if accessible_stores.exists() and alert.store not in accessible_stores:
-            return Response({
-                'error': 'You do not have access to this store'
-            }, status=status.HTTP_403_FORBIDDEN)
-    
-    alert.is_acknowledged = True
-    alert.acknowledged_by = request.user
-    alert.acknowledged_at = timezone.now()
-    alert.save()
+    # The access check only needs the store FK, so load a narrow row
+    alert = get_object_or_404(InventoryAlert.objects.only('id', 'store_id'), id=alert_id)
+
+    # Check if user has access to this store; set membership on pks avoids
+    # re-running the stores query per check
+    accessible_ids = get_accessible_store_ids(request.user)
+    if accessible_ids and alert.store_id not in set(accessible_ids):
+        return Response({
+            'error': 'You do not have access to this store'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    # One targeted UPDATE instead of rewriting every column via save()
+    InventoryAlert.objects.filter(pk=alert.pk).update(
+        is_acknowledged=True,
+        acknowledged_by=request.user,
+        acknowledged_at=timezone.now()
+    )
     
     logger.info(f"Alert {alert_id} acknowledged by user {request.user.id}")
     
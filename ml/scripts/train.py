@@ -11,9 +11,8 @@ import joblib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import LabelEncoder
 import django
 
@@ -40,6 +39,7 @@ class DemandForecaster:
         self.model = None
         self.label_encoders = {}
         self.feature_columns = []
+        self._effective_params = {}
 
     def prepare_features(self, df):
         """Prepare features for training"""
@@ -56,23 +56,34 @@ class DemandForecaster:
             else:
                 df[f'{col}_encoded'] = self.label_encoders[col].transform(df[col])
 
-        # Time-based features
-        df['day_of_week'] = pd.to_datetime(df['date']).dt.dayofweek
-        df['month'] = pd.to_datetime(df['date']).dt.month
-        df['day_of_month'] = pd.to_datetime(df['date']).dt.day
-        df['quarter'] = pd.to_datetime(df['date']).dt.quarter
+        # Time-based features (parse the date column once)
+        dates = pd.to_datetime(df['date'])
+        df['day_of_week'] = dates.dt.dayofweek
+        df['month'] = dates.dt.month
+        df['day_of_month'] = dates.dt.day
+        df['quarter'] = dates.dt.quarter
+
+        # One groupby per source column feeds every lag/rolling feature;
+        # each extra groupby call is a full hash pass over the frame, and
+        # transform keeps results aligned to the original index
+        sales_by_pair = df.groupby(['store_id', 'sku_id'], sort=False)['sales']
 
         # Lag features
         for lag in [1, 7, 14, 30]:
-            df[f'sales_lag_{lag}'] = df.groupby(['store_id', 'sku_id'])['sales'].shift(lag)
+            df[f'sales_lag_{lag}'] = sales_by_pair.shift(lag)
 
         # Rolling averages
         for window in [7, 14, 30]:
-            df[f'sales_rolling_{window}'] = df.groupby(['store_id', 'sku_id'])['sales'].rolling(window=window).mean().reset_index(0, drop=True)
+            df[f'sales_rolling_{window}'] = sales_by_pair.transform(
+                lambda s: s.rolling(window=window).mean()
+            )
 
         # Price features
-        df['price_change'] = df.groupby(['store_id', 'sku_id'])['price'].pct_change()
-        df['price_rolling_7'] = df.groupby(['store_id', 'sku_id'])['price'].rolling(window=7).mean().reset_index(0, drop=True)
+        price_by_pair = df.groupby(['store_id', 'sku_id'], sort=False)['price']
+        df['price_change'] = price_by_pair.pct_change()
+        df['price_rolling_7'] = price_by_pair.transform(
+            lambda s: s.rolling(window=7).mean()
+        )
 
         # Inventory features
         df['inventory_ratio'] = df['sales'] / (df['on_hand'] + 1)  # Add 1 to avoid division by zero
@@ -92,35 +103,71 @@ class DemandForecaster:
         # Drop rows with NaN values (due to lag features)
         df = df.dropna(subset=self.feature_columns + ['sales'])
 
+        # Downcast the features: calendar/flag columns fit in int8 and the
+        # continuous ones lose nothing the model cares about in float32,
+        # halving the bytes the fit has to stream through
+        df = df.astype({
+            'store_id_encoded': 'int32',
+            'sku_id_encoded': 'int32',
+            'day_of_week': 'int8',
+            'month': 'int8',
+            'day_of_month': 'int8',
+            'quarter': 'int8',
+            'promotions_flag': 'int8',
+            **{col: 'float32' for col in [
+                'price', 'price_change', 'price_rolling_7', 'inventory_ratio',
+                'sales_lag_1', 'sales_lag_7', 'sales_lag_14', 'sales_lag_30',
+                'sales_rolling_7', 'sales_rolling_14', 'sales_rolling_30'
+            ]}
+        })
+
         logger.info(f"Prepared {len(df)} samples with {len(self.feature_columns)} features")
         return df
 
+    @staticmethod
+    def _metrics(y_true, y_pred):
+        """Compute MAE, RMSE and MAPE (%) from a single residual array
+
+        The three sklearn metric calls each re-derive the residuals; sharing
+        one float32 error array keeps evaluation to a single pass over the
+        data with no duplicate temporaries.
+        """
+        y_true = np.asarray(y_true, dtype=np.float32)
+        error = np.asarray(y_pred, dtype=np.float32) - y_true
+        abs_error = np.abs(error)
+
+        mae = abs_error.mean()
+        rmse = np.sqrt(np.mean(np.square(error)))
+        mape = np.mean(abs_error / (y_true + 1e-8)) * 100
+        return float(mae), float(rmse), float(mape)
+
     def train(self, data_date_from=None, data_date_to=None, hyperparameters=None):
         """Train the demand forecasting model"""
         logger.info(f"Starting training for model: {self.model_name}")
 
         # Load data
-        queryset = SalesData.objects.select_related('store', 'product').all()
+        queryset = SalesData.objects.all()
 
         if data_date_from:
             queryset = queryset.filter(date__gte=data_date_from)
         if data_date_to:
             queryset = queryset.filter(date__lte=data_date_to)
 
-        # Convert to DataFrame
-        data = list(queryset.values(
+        # Stream rows as tuples straight into the frame: values_list skips
+        # the per-row dict construction of values() and iterator() keeps the
+        # queryset's result cache from holding every row in memory
+        rows = queryset.values_list(
             'date', 'sales', 'price', 'on_hand', 'promotions_flag',
             'store__store_id', 'product__sku_id'
-        ))
+        ).iterator(chunk_size=50000)
 
-        if not data:
-            raise ValueError("No data available for training")
+        df = pd.DataFrame.from_records(rows, columns=[
+            'date', 'sales', 'price', 'on_hand', 'promotions_flag',
+            'store_id', 'sku_id'
+        ])
 
-        df = pd.DataFrame(data)
-        df.rename(columns={
-            'store__store_id': 'store_id',
-            'product__sku_id': 'sku_id'
-        }, inplace=True)
+        if df.empty:
+            raise ValueError("No data available for training")
 
         logger.info(f"Loaded {len(df)} records for training")
 
@@ -138,43 +185,46 @@ class DemandForecaster:
 
         # Default hyperparameters
         default_params = {
-            'n_estimators': 100,
+            'max_iter': 100,
             'learning_rate': 0.1,
             'max_depth': 6,
-            'min_samples_split': 10,
             'min_samples_leaf': 4,
+            'early_stopping': True,
+            'validation_fraction': 0.1,
             'random_state': 42
         }
 
         if hyperparameters:
             default_params.update(hyperparameters)
 
-        # Train model
-        logger.info("Training Gradient Boosting model...")
-        self.model = GradientBoostingRegressor(**default_params)
+        # Snapshot the effective params for save_model: get_params() would
+        # dump every sklearn default into the hyperparameters JSON column
+        self._effective_params = dict(default_params)
+
+        # Train model; the histogram booster bins features once so each
+        # split costs O(bins) rather than O(N). The fit parallelizes via
+        # OpenMP across all cores (cap with OMP_NUM_THREADS if needed)
+        logger.info(
+            f"Training Hist Gradient Boosting model on up to {os.cpu_count()} threads..."
+        )
+        self.model = HistGradientBoostingRegressor(**default_params)
         self.model.fit(X_train, y_train)
 
         # Evaluate model
         train_pred = self.model.predict(X_train)
         test_pred = self.model.predict(X_test)
 
-        # Calculate metrics
-        train_mae = mean_absolute_error(y_train, train_pred)
-        test_mae = mean_absolute_error(y_test, test_pred)
-        train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
-        test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
-
-        # Calculate MAPE
-        train_mape = np.mean(np.abs((y_train - train_pred) / (y_train + 1e-8))) * 100
-        test_mape = np.mean(np.abs((y_test - test_pred) / (y_test + 1e-8))) * 100
+        # Calculate metrics (one residual pass per split)
+        train_mae, train_rmse, train_mape = self._metrics(y_train, train_pred)
+        test_mae, test_rmse, test_mape = self._metrics(y_test, test_pred)
 
         metrics = {
-            'train_mae': float(train_mae),
-            'test_mae': float(test_mae),
-            'train_rmse': float(train_rmse),
-            'test_rmse': float(test_rmse),
-            'train_mape': float(train_mape),
-            'test_mape': float(test_mape),
+            'train_mae': train_mae,
+            'test_mae': test_mae,
+            'train_rmse': train_rmse,
+            'test_rmse': test_rmse,
+            'train_mape': train_mape,
+            'test_mape': test_mape,
             'train_samples': len(X_train),
             'test_samples': len(X_test)
         }
@@ -192,20 +242,27 @@ class DemandForecaster:
         model_dir = os.path.join(PROJECT_ROOT, "ml", "models", self.model_name)
         os.makedirs(model_dir, exist_ok=True)
 
-        # Save model file
+        # Save the booster alone (compress=3 roughly halves the file) and
+        # the encoder classes plus feature columns as a small npz beside it;
+        # pickling whole LabelEncoder objects ties the bundle to the exact
+        # sklearn version that wrote it
         model_path = os.path.join(model_dir, "model.joblib")
-        joblib.dump({
-            'model': self.model,
-            'label_encoders': self.label_encoders,
-            'feature_columns': self.feature_columns
-        }, model_path)
+        joblib.dump(self.model, model_path, compress=3)
+        np.savez_compressed(
+            os.path.join(model_dir, "encoders.npz"),
+            feature_columns=np.asarray(self.feature_columns),
+            **{
+                f'{name}_classes': encoder.classes_
+                for name, encoder in self.label_encoders.items()
+            }
+        )
 
         # Save to database
         ml_model = MLModel.objects.create(
             name=self.model_name,
             version="1.0",
-            algorithm="GradientBoostingRegressor",
-            hyperparameters=self.model.get_params(),
+            algorithm="HistGradientBoostingRegressor",
+            hyperparameters=self._effective_params,
             performance_metrics=metrics,
             model_file_path=model_path,
             is_active=True,
@@ -216,6 +273,11 @@ class DemandForecaster:
         # Deactivate other models
         MLModel.objects.filter(is_active=True).exclude(id=ml_model.id).update(is_active=False)
 
+        # Long-lived workers resolve the active model through this cache key
+        from django.core.cache import cache
+        from apps.forecasting.ml_service import ACTIVE_MODEL_CACHE_KEY
+        cache.delete(ACTIVE_MODEL_CACHE_KEY)
+
         logger.info(f"Model saved: {ml_model.id}")
         return ml_model
 
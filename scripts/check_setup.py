@@ -3,103 +3,98 @@
 Setup verification script for SmartInventory
 """
 
-import os
 import sys
 import requests
-import time
-from urllib.parse import urljoin
-
-def check_service(name, url, timeout=30):
-    """Check if a service is responding"""
-    print(f"Checking {name} at {url}...")
-
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                print(f"✅ {name} is running")
-                return True
-        except requests.exceptions.RequestException:
-            pass
-
-        time.sleep(2)
-
-    print(f"❌ {name} is not responding")
-    return False
-
-def check_static_files():
-    """Check if static files are accessible"""
-    static_urls = [
-        "http://localhost:8000/static/css/main.css",
-        "http://localhost:8000/static/js/main.js",
-        "http://localhost:8000/static/js/api.js"
-    ]
-
-    for url in static_urls:
-        try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                print(f"✅ Static file accessible: {url}")
-            else:
-                print(f"❌ Static file not found: {url}")
-                return False
-        except requests.exceptions.RequestException:
-            print(f"❌ Cannot access static file: {url}")
-            return False
-
-    return True
-
-def check_api_endpoints():
-    """Check if API endpoints are working"""
-    endpoints = [
-        ("Health Check", "http://localhost:8000/health/"),
-        ("API Docs", "http://localhost:8000/docs/"),
-        ("Dashboard Stats", "http://localhost:8000/api/dashboard/stats/")
-    ]
-
-    for name, url in endpoints:
-        try:
-            response = requests.get(url, timeout=5)
-            if response.status_code in [200, 401]:  # 401 is OK for protected endpoints
-                print(f"✅ {name} endpoint working")
-            else:
-                print(f"❌ {name} endpoint failed: {response.status_code}")
-                return False
-        except requests.exceptions.RequestException as e:
-            print(f"❌ {name} endpoint error: {e}")
-            return False
-
-    return True
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One session shares keep-alive connections across every probe instead of
+# paying a TCP connect per request
+session = requests.Session()
+
+# Service waits go through urllib3's retry machinery: one connection with
+# kernel-scheduled backoff instead of a poll-and-sleep loop that reconnects
+# every attempt. The quick probes above stay on the non-retrying session.
+service_session = requests.Session()
+service_session.mount('http://', HTTPAdapter(max_retries=Retry(
+    total=10, backoff_factor=0.5, status_forcelist=[502, 503, 504]
+)))
+
+def check_service(name, url):
+    """Check if a service is responding, waiting for it to come up"""
+    try:
+        response = service_session.get(url, timeout=(2, 5))
+        if response.status_code == 200:
+            return True, f"✅ {name} is running"
+    except requests.exceptions.RequestException:
+        pass
+
+    return False, f"❌ {name} is not responding"
+
+def check_static_file(url):
+    """Check if a static file is accessible"""
+    try:
+        response = session.get(url, timeout=5)
+        if response.status_code == 200:
+            return True, f"✅ Static file accessible: {url}"
+        return False, f"❌ Static file not found: {url}"
+    except requests.exceptions.RequestException:
+        return False, f"❌ Cannot access static file: {url}"
+
+def check_api_endpoint(name, url):
+    """Check if an API endpoint is working"""
+    try:
+        response = session.get(url, timeout=5)
+        if response.status_code in [200, 401]:  # 401 is OK for protected endpoints
+            return True, f"✅ {name} endpoint working"
+        return False, f"❌ {name} endpoint failed: {response.status_code}"
+    except requests.exceptions.RequestException as e:
+        return False, f"❌ {name} endpoint error: {e}"
+
+def run_checks(executor, check, targets):
+    """Run one check per target concurrently and print results in order"""
+    results = list(executor.map(lambda args: check(*args), targets))
+    for _, message in results:
+        print(message)
+    return all(ok for ok, _ in results)
 
 def main():
     """Main setup verification"""
     print("🔍 SmartInventory Setup Verification")
     print("=" * 40)
 
-    # Check main services
     services = [
         ("Django Web Server", "http://localhost:8000/"),
         ("MySQL Database", "http://localhost:8000/health/"),
         ("Redis Cache", "http://localhost:8000/health/")
     ]
 
-    all_good = True
+    static_files = [
+        ("http://localhost:8000/static/css/main.css",),
+        ("http://localhost:8000/static/js/main.js",),
+        ("http://localhost:8000/static/js/api.js",)
+    ]
 
-    # Check services
-    for name, url in services:
-        if not check_service(name, url):
-            all_good = False
+    endpoints = [
+        ("Health Check", "http://localhost:8000/health/"),
+        ("API Docs", "http://localhost:8000/docs/"),
+        ("Dashboard Stats", "http://localhost:8000/api/dashboard/stats/")
+    ]
+
+    # Probe everything concurrently: total wall time is the slowest check,
+    # not the sum of every service wait and endpoint timeout
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        print("Checking services...")
+        all_good = run_checks(executor, check_service, services)
 
-    # Check static files
-    print("\n📁 Checking Static Files...")
-    if not check_static_files():
-        all_good = False
+        print("\n📁 Checking Static Files...")
+        if not run_checks(executor, check_static_file, static_files):
+            all_good = False
 
-    # Check API endpoints
-    print("\n🔌 Checking API Endpoints...")
-    if not check_api_endpoints():
-        all_good = False
+        print("\n🔌 Checking API Endpoints...")
+        if not run_checks(executor, check_api_endpoint, endpoints):
+            all_good = False
 
     print("\n" + "=" * 40)
     if all_good:
@@ -112,4 +107,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,22 +1,13 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartinventory.settings')
 
-app = Celery('smartinventory')
-
-# Using a string here means the worker doesn't have to serialize
-# the configuration object to child processes.
-app.config_from_object('django.conf:settings', namespace='CELERY')
-
-# Load task modules from all registered Django apps.
-app.autodiscover_tasks()
-
-# Celery Beat Schedule
-from celery.schedules import crontab
-
-app.conf.beat_schedule = {
+# Module-level constants so the schedule and routing tables are built once
+# at import and stay importable from tests without going through app.conf
+BEAT_SCHEDULE = {
     'model-health-check': {
         'task': 'apps.forecasting.tasks.model_health_check',
         'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
@@ -25,10 +16,26 @@ app.conf.beat_schedule = {
         'task': 'apps.data_management.tasks.data_quality_check',
         'schedule': crontab(hour=1, minute=0),  # Daily at 1 AM
     },
+    'refresh-stockout-summary': {
+        'task': 'apps.forecasting.tasks.refresh_stockout_summary',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
 }
 
-app.conf.task_routes = {
+TASK_ROUTES = {
     'apps.forecasting.tasks.train_model': {'queue': 'ml_tasks'},
     'apps.forecasting.tasks.batch_predict': {'queue': 'ml_tasks'},
     'apps.data_management.tasks.process_upload': {'queue': 'data_tasks'},
-}
\ No newline at end of file
+}
+
+app = Celery('smartinventory')
+
+# Using a string here means the worker doesn't have to serialize
+# the configuration object to child processes.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Load task modules from all registered Django apps.
+app.autodiscover_tasks()
+
+app.conf.beat_schedule = BEAT_SCHEDULE
+app.conf.task_routes = TASK_ROUTES
@@ -41,6 +41,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.core.middleware.MaxUploadSizeMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,7 +75,10 @@ WSGI_APPLICATION = 'smartinventory.wsgi.application'
 # Database
 DATABASES = {
     'default': dj_database_url.parse(
-        config('DATABASE_URL', default='sqlite:///db.sqlite3')
+        config('DATABASE_URL', default='sqlite:///db.sqlite3'),
+        # Keep DB connections alive between requests/tasks instead of
+        # reconnecting per task in Celery workers
+        conn_max_age=config('DB_CONN_MAX_AGE', default=60, cast=int),
     )
 }
 
@@ -86,6 +90,15 @@ if DATABASES['default'].get('ENGINE', '').endswith('mysql'):
         "SET sql_mode='STRICT_TRANS_TABLES,ERROR_FOR_DIVISION_BY_ZERO,NO_ENGINE_SUBSTITUTION'"
     )
 
+# Password hashing - Argon2id first so new passwords use the tuned hasher;
+# PBKDF2 stays listed so existing hashes keep verifying
+PASSWORD_HASHERS = [
+    'apps.core.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
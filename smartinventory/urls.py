@@ -2,44 +2,77 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from django.views.generic.base import RedirectView
 from django.templatetags.static import static as static_tag
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 
+# Liveness probes hit this endpoint constantly; only the timestamp varies,
+# so the JSON is pre-encoded as bytes and spliced instead of running the
+# dict -> json.dumps path per request
+_HEALTH_PREFIX = b'{"status": "healthy", "timestamp": '
+_HEALTH_SUFFIX = b', "service": "smartinventory"}'
+
 def health_check(request):
     """Basic health check endpoint"""
-    return JsonResponse({
-        'status': 'healthy',
-        'timestamp': time.time(),
-        'service': 'smartinventory'
-    })
+    return HttpResponse(
+        _HEALTH_PREFIX + f'{time.time():.3f}'.encode() + _HEALTH_SUFFIX,
+        content_type='application/json'
+    )
 
-def health_check_detailed(request):
-    """Detailed health check with dependency status"""
-    from django.core.cache import cache
+def _check_database():
     from django.db import connection
 
-    status = {'status': 'healthy', 'checks': {}}
-
-    # Database check
     try:
         with connection.cursor() as cursor:
             cursor.execute('SELECT 1')
-        status['checks']['database'] = 'healthy'
-    except Exception as e:
-        status['checks']['database'] = f'unhealthy: {str(e)}'
-        status['status'] = 'unhealthy'
+    finally:
+        # Probe threads are short-lived; don't leave their connections open
+        connection.close()
 
-    # Redis check
-    try:
-        cache.set('health_check', 'ok', 30)
-        cache.get('health_check')
-        status['checks']['redis'] = 'healthy'
-    except Exception as e:
-        status['checks']['redis'] = f'unhealthy: {str(e)}'
-        status['status'] = 'unhealthy'
+def _check_redis():
+    from django.core.cache import cache
+
+    cache.set('health_check', 'ok', 30)
+    cache.get('health_check')
+
+# Probe storms from many replicas shouldn't multiply dependency load:
+# the computed status is reused in-process for a short window
+_health_cache = {'ts': 0.0, 'payload': None}
+_health_cache_lock = threading.Lock()
+HEALTH_CACHE_TTL = 1.5
+
+def health_check_detailed(request):
+    """Detailed health check with dependency status"""
+    with _health_cache_lock:
+        if (
+            _health_cache['payload'] is not None
+            and time.monotonic() - _health_cache['ts'] < HEALTH_CACHE_TTL
+        ):
+            return JsonResponse(_health_cache['payload'])
+
+    status = {'status': 'healthy', 'checks': {}}
+
+    # The probes are independent I/O, so run them concurrently with a
+    # bounded wait - a hung dependency reports unhealthy instead of
+    # stalling the endpoint the load balancer polls
+    probes = {'database': _check_database, 'redis': _check_redis}
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {name: executor.submit(probe) for name, probe in probes.items()}
+        for name, future in futures.items():
+            try:
+                future.result(timeout=2.0)
+                status['checks'][name] = 'healthy'
+            except Exception as e:
+                status['checks'][name] = f'unhealthy: {str(e)}'
+                status['status'] = 'unhealthy'
+
+    with _health_cache_lock:
+        _health_cache['ts'] = time.monotonic()
+        _health_cache['payload'] = status
 
     return JsonResponse(status)
 
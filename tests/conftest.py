@@ -19,6 +19,7 @@ def pytest_configure():
             }
         },
         INSTALLED_APPS=[
+            'django.contrib.admin',
             'django.contrib.auth',
             'django.contrib.contenttypes',
             'django.contrib.sessions',
@@ -35,6 +36,24 @@ def pytest_configure():
         SECRET_KEY='test-secret-key',
         USE_TZ=True,
         ROOT_URLCONF='smartinventory.urls',
+        STATIC_URL='/static/',
+        # The urlconf mounts the admin, which needs templates and the
+        # auth/messages context processors to import
+        TEMPLATES=[
+            {
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'DIRS': [],
+                'APP_DIRS': True,
+                'OPTIONS': {
+                    'context_processors': [
+                        'django.template.context_processors.debug',
+                        'django.template.context_processors.request',
+                        'django.contrib.auth.context_processors.auth',
+                        'django.contrib.messages.context_processors.messages',
+                    ],
+                },
+            },
+        ],
         MIDDLEWARE=[
             'django.middleware.security.SecurityMiddleware',
             'django.contrib.sessions.middleware.SessionMiddleware',
@@ -50,6 +69,20 @@ def pytest_configure():
             'DEFAULT_PERMISSION_CLASSES': [
                 'rest_framework.permissions.IsAuthenticated',
             ],
+            # Mirror production pagination so list endpoints return the
+            # {'results': ...} envelope the tests assert on
+            'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+            'PAGE_SIZE': 100,
+        },
+        # Uploaded test files never need to hit disk - keep FileField saves
+        # in memory instead of writing (and leaking) media files per run
+        STORAGES={
+            'default': {
+                'BACKEND': 'django.core.files.storage.InMemoryStorage',
+            },
+            'staticfiles': {
+                'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+            },
         },
         CACHES={
             'default': {
@@ -58,9 +91,16 @@ def pytest_configure():
         },
         CELERY_TASK_ALWAYS_EAGER=True,
         CELERY_TASK_EAGER_PROPAGATES=True,
+        # Chords need a result backend even when tasks run eagerly
+        CELERY_RESULT_BACKEND='cache+memory://',
     )
     django.setup()
 
+    # Bind the project Celery app so the eager/backend settings above apply
+    # to tasks invoked during tests (chords synchronize via the backend)
+    from smartinventory.celery import app as celery_app
+    celery_app.set_default()
+
 @pytest.fixture
 def api_client():
     """DRF API client"""
@@ -9,6 +9,14 @@ from rest_framework.authtoken.models import Token
 from decimal import Decimal
 from datetime import date
 
+@pytest.fixture(scope="module")
+def csv_bytes():
+    """Sample CSV upload content, encoded once for the whole module"""
+    return (
+        "date,store_id,sku_id,sales,price,on_hand,promotions_flag\n"
+        "2024-01-01,STORE001,SKU001,10,25.99,100,0"
+    ).encode('utf-8')
+
 @pytest.mark.django_db
 class TestAuthenticationAPI:
     """Test authentication endpoints"""
@@ -67,18 +75,15 @@ class TestDataManagementAPI:
         assert len(response.data['results']) == 1
         assert response.data['results'][0]['store_id'] == 'TEST001'
     
-    def test_data_upload_create(self, api_client, user):
+    def test_data_upload_create(self, api_client, user, csv_bytes):
         """Test data upload creation"""
         token = Token.objects.create(user=user)
         api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
-        
-        # Create a simple CSV file content
-        csv_content = "date,store_id,sku_id,sales,price,on_hand,promotions_flag\n2024-01-01,STORE001,SKU001,10,25.99,100,0"
-        
+
         from django.core.files.uploadedfile import SimpleUploadedFile
         csv_file = SimpleUploadedFile(
             "test_data.csv",
-            csv_content.encode('utf-8'),
+            csv_bytes,
             content_type="text/csv"
         )
         
@@ -121,13 +126,41 @@ class TestForecastingAPI:
         """Test alerts list endpoint"""
         token = Token.objects.create(user=user)
         api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
-        
+
         url = reverse('forecasting:alert-list')
         response = api_client.get(url)
-        
+
         assert response.status_code == status.HTTP_200_OK
         assert 'results' in response.data
 
+    def test_alerts_list_query_count(self, api_client, user, store, product,
+                                     django_assert_max_num_queries):
+        """Alert rows must not add per-row FK queries (select_related joins)"""
+        from apps.forecasting.models import InventoryAlert
+
+        InventoryAlert.objects.bulk_create([
+            InventoryAlert(
+                store=store,
+                product=product,
+                alert_type='stockout_risk',
+                priority='high',
+                message=f'Alert {i}',
+                current_inventory=5,
+                acknowledged_by=user
+            )
+            for i in range(3)
+        ])
+
+        token = Token.objects.create(user=user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        url = reverse('forecasting:alert-list')
+        with django_assert_max_num_queries(6):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 3
+
 @pytest.mark.django_db
 class TestDashboardAPI:
     """Test dashboard endpoints"""
@@ -143,8 +143,8 @@ class TestDemandForecaster:
 class TestCeleryTasks:
     """Test Celery tasks"""
     
-    @patch('apps.forecasting.tasks.MLService')
-    def test_batch_predict_task(self, mock_ml_service, store, product):
+    @patch('apps.forecasting.tasks.get_ml_service')
+    def test_batch_predict_task(self, mock_ml_service, store, product, sales_data):
         """Test batch prediction task"""
         from apps.forecasting.tasks import batch_predict
         from apps.forecasting.models import MLModel, BatchPredictionJob
@@ -166,17 +166,26 @@ class TestCeleryTasks:
         # Mock ML service
         mock_service_instance = Mock()
         mock_service_instance.is_model_loaded.return_value = True
-        mock_service_instance.predict_single.return_value = {
-            'demand': 15.5,
-            'confidence_interval': {'lower': 12.0, 'upper': 19.0}
-        }
+        mock_service_instance.predict_batch.return_value = [
+            {
+                'store_id': store.store_id,
+                'sku_id': product.sku_id,
+                'date': date.today(),
+                'predicted_demand': 15.5,
+                'confidence_lower': 12.0,
+                'confidence_upper': 19.0
+            }
+        ]
         mock_ml_service.return_value = mock_service_instance
         
-        # Run task
-        result = batch_predict(job.id)
-        
-        assert result['status'] == 'completed'
-        assert result['completed'] > 0
+        # Run task; chunks and the finalize callback run eagerly in tests
+        result = batch_predict.apply(args=[job.id]).get()
+
+        assert result['status'] == 'dispatched'
+
+        job.refresh_from_db()
+        assert job.status == 'completed'
+        assert job.completed_predictions > 0
     
     def test_model_health_check_no_model(self):
         """Test model health check with no active model"""
@@ -4,18 +4,27 @@ Model tests
 
 import pytest
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from decimal import Decimal
 from datetime import date, datetime
 
+# Model imports are safe at module level: conftest's pytest_configure has
+# set up Django before pytest collects this file
+from apps.core.models import Store, Product, UserProfile
+from apps.data_management.models import SalesData, DataUpload
+from apps.forecasting.models import MLModel, ForecastPrediction, InventoryAlert
+
+# Frozen timestamps keep fixture rows deterministic across runs (and
+# identical under --reuse-db) instead of re-reading the clock per test
+TEST_DATE = date(2024, 1, 1)
+TRAINING_DATE = datetime(2024, 1, 1, 12, 0, 0)
+
 @pytest.mark.django_db
 class TestCoreModels:
     """Test core models"""
     
     def test_store_creation(self):
         """Test store model creation"""
-        from apps.core.models import Store
-        
         store = Store.objects.create(
             store_id='TEST001',
             name='Test Store',
@@ -29,17 +38,16 @@ class TestCoreModels:
     
     def test_store_unique_constraint(self):
         """Test store unique constraint"""
-        from apps.core.models import Store
-        
         Store.objects.create(store_id='TEST001', name='Store 1')
         
+        # The inner atomic block turns the failed INSERT into a savepoint
+        # rollback instead of poisoning the test's outer transaction
         with pytest.raises(IntegrityError):
-            Store.objects.create(store_id='TEST001', name='Store 2')
+            with transaction.atomic():
+                Store.objects.create(store_id='TEST001', name='Store 2')
     
     def test_product_creation(self):
         """Test product model creation"""
-        from apps.core.models import Product
-        
         product = Product.objects.create(
             sku_id='SKU001',
             name='Test Product',
@@ -54,8 +62,6 @@ class TestCoreModels:
     
     def test_user_profile_creation(self, user):
         """Test user profile creation"""
-        from apps.core.models import UserProfile, Store
-        
         store = Store.objects.create(store_id='TEST001', name='Test Store')
         
         profile = UserProfile.objects.create(
@@ -63,7 +69,13 @@ class TestCoreModels:
             role='manager',
             phone='123-456-7890'
         )
-        profile.stores.add(store)
+        # One INSERT into the through table; .add() would SELECT for
+        # existence first
+        UserProfile.stores.through.objects.bulk_create(
+            [UserProfile.stores.through(userprofile_id=profile.pk,
+                                        store_id=store.pk)],
+            ignore_conflicts=True
+        )
         
         assert profile.user == user
         assert profile.role == 'manager'
@@ -76,12 +88,10 @@ class TestDataManagementModels:
     
     def test_sales_data_creation(self, store, product, user):
         """Test sales data creation"""
-        from apps.data_management.models import SalesData
-        
         sales_data = SalesData.objects.create(
             store=store,
             product=product,
-            date=date.today(),
+            date=TEST_DATE,
             sales=Decimal('15.50'),
             price=Decimal('29.99'),
             on_hand=50,
@@ -96,12 +106,10 @@ class TestDataManagementModels:
     
     def test_sales_data_unique_constraint(self, store, product, user):
         """Test sales data unique constraint"""
-        from apps.data_management.models import SalesData
-        
         SalesData.objects.create(
             store=store,
             product=product,
-            date=date.today(),
+            date=TEST_DATE,
             sales=Decimal('10.00'),
             price=Decimal('20.00'),
             on_hand=100,
@@ -109,19 +117,19 @@ class TestDataManagementModels:
         )
         
         with pytest.raises(IntegrityError):
-            SalesData.objects.create(
-                store=store,
-                product=product,
-                date=date.today(),
-                sales=Decimal('15.00'),
-                price=Decimal('25.00'),
-                on_hand=80,
-                created_by=user
-            )
+            with transaction.atomic():
+                SalesData.objects.create(
+                    store=store,
+                    product=product,
+                    date=TEST_DATE,
+                    sales=Decimal('15.00'),
+                    price=Decimal('25.00'),
+                    on_hand=80,
+                    created_by=user
+                )
     
     def test_data_upload_creation(self, user):
         """Test data upload creation"""
-        from apps.data_management.models import DataUpload
         from django.core.files.uploadedfile import SimpleUploadedFile
         
         test_file = SimpleUploadedFile(
@@ -146,8 +154,6 @@ class TestForecastingModels:
     
     def test_ml_model_creation(self):
         """Test ML model creation"""
-        from apps.forecasting.models import MLModel
-        
         model = MLModel.objects.create(
             name='test_model',
             version='1.0',
@@ -155,7 +161,7 @@ class TestForecastingModels:
             hyperparameters={'n_estimators': 100},
             performance_metrics={'mae': 2.5, 'rmse': 3.2},
             model_file_path='/path/to/model.joblib',
-            training_date=datetime.now()
+            training_date=TRAINING_DATE
         )
         
         assert model.name == 'test_model'
@@ -165,20 +171,18 @@ class TestForecastingModels:
     
     def test_forecast_prediction_creation(self, store, product):
         """Test forecast prediction creation"""
-        from apps.forecasting.models import MLModel, ForecastPrediction
-        
         model = MLModel.objects.create(
             name='test_model',
             version='1.0',
             algorithm='GradientBoostingRegressor',
-            training_date=datetime.now()
+            training_date=TRAINING_DATE
         )
         
         prediction = ForecastPrediction.objects.create(
             model=model,
             store=store,
             product=product,
-            prediction_date=date.today(),
+            prediction_date=TEST_DATE,
             predicted_demand=15.5,
             confidence_interval_lower=12.0,
             confidence_interval_upper=19.0
@@ -190,8 +194,6 @@ class TestForecastingModels:
     
     def test_inventory_alert_creation(self, store, product):
         """Test inventory alert creation"""
-        from apps.forecasting.models import InventoryAlert
-        
         alert = InventoryAlert.objects.create(
             store=store,
             product=product,